@@ -4,23 +4,33 @@ MCP Simple Agent - A simplified agent that works with MCP servers.
 """
 
 from datetime import datetime
+import asyncio
+import importlib.util
+import inspect
 import json
 import logging
 import time
 from enum import Enum
-from typing import List, Dict, Any, Callable, Optional, Tuple, Union
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Optional, Tuple, Union
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from context_budget import ContextBudget
+from journal import StepJournal
+from message_store import MessageStore, prompt_chars
+from observations import READ_OBSERVATION, READ_OBSERVATION_HELP, ObservationStore
+from response_cache import CacheMissError, ResponseCache, is_async_model
+from scheduler import RequestScheduler, estimate_tokens, trajectory_priority
+from telemetry import Tracer
+from tool_cache import CachePolicy, ToolResultCache
+from tool_manifest import ManifestCache, render_system_prompt
+from tool_parser import ToolCallParser, ToolCallScanner
 
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+if TYPE_CHECKING:
+    from mcp import StdioServerParameters
+
+# mcp and openai take hundreds of milliseconds to import, so they are only
+# imported once a session is opened or a model is called
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mcp_simple_agent")
 
 # Constants for message roles
@@ -28,22 +38,23 @@ SYSTEM = "system"
 USER = "user"
 ASSISTANT = "assistant"
 
+# A model maps OpenAI-format messages to text. It may return the text directly,
+# return an awaitable, or return an async iterator of streamed text chunks.
+ModelOutput = Union[str, Awaitable[str], AsyncIterator[str]]
+ModelFunction = Callable[[List[Dict[str, Any]]], ModelOutput]
+
 def parse_json_tool_call(text: str) -> Tuple[str, Dict[str, Any]]:
     """Parse a JSON tool call from text."""
-    try:
-        start_idx = text.find("{")
-        if start_idx == -1:
-            raise ValueError("No JSON object found in text")
-        
-        json_str = text[start_idx:]
-        tool_call = json.loads(json_str)
-        
-        if "name" not in tool_call:
-            raise ValueError("Tool call missing 'name' field")
-        
-        return tool_call["name"], tool_call.get("arguments", {})
-    except (json.JSONDecodeError, Exception) as e:
-        raise ValueError(f"Failed to parse tool call: {str(e)}")
+    return parse_json_tool_calls(text)[0]
+
+def parse_json_tool_calls(text: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Parse one or more JSON tool calls from text.
+    
+    Accepts a single call object, a JSON array of call objects, or an object
+    with a "calls" list of call objects. See ToolCallParser for the
+    malformations that are repaired.
+    """
+    return ToolCallParser().parse(text)
 
 def clean_observation(observation: str) -> str:
     """Clean up the raw observation to make it user-friendly."""
@@ -57,20 +68,97 @@ def clean_observation(observation: str) -> str:
             pass
     return f"Observation: {observation}"
 
+def create_openai_model(model: str = "gpt-4o-mini",
+                        temperature: float = 0.7,
+                        max_tokens: int = 2048,
+                        api_key: Optional[str] = None,
+                        response_cache: Optional[ResponseCache] = None,
+                        scheduler: Optional[RequestScheduler] = None) -> ModelFunction:
+    """Create a streaming OpenAI model function.
+    
+    The function streams the completion with the async client, so the event
+    loop stays free and the tool call is dispatched as soon as its JSON object
+    closes. It can be shared by many agents, e.g. in a batch run.
+    
+    With a response cache, recorded responses are replayed instead of calling
+    the API. The client is created on the first real request, so a run served
+    entirely from the cache needs no API key.
+    
+    With a scheduler, requests are admitted within its rate limits, sharing
+    them with every other model function using it, and retried on rate limit
+    and transient errors.
+    """
+    if not OPENAI_AVAILABLE:
+        raise ImportError("OpenAI package is not installed. Please install it with 'pip install openai'.")
+    
+    # Create the OpenAI client lazily and the streaming model function
+    client = None
+    async def model_function(messages):
+        nonlocal client
+        if client is None:
+            from openai import AsyncOpenAI
+            # The scheduler does the retrying, with shared backoff
+            client = AsyncOpenAI(api_key=api_key, **({"max_retries": 0} if scheduler is not None else {}))
+        send = lambda: client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature,
+            max_tokens=max_tokens, response_format={"type": "json_object"},
+            stream=True,
+        )
+        if scheduler is not None:
+            stream = await scheduler.run(
+                send, estimate_tokens(messages) + max_tokens, trajectory_priority(messages)
+            )
+        else:
+            stream = await send()
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+    
+    if response_cache is not None:
+        return response_cache.wrap(
+            model_function, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+    return model_function
+
 class MCPSimpleAgent:
-    """A simplified agent that works with MCP servers."""
+    """A simplified agent that works with MCP servers.
+    
+    `server_parameters` is a single server, or a dict of named servers whose
+    tools are combined behind a `sessions.ServerRouter`.
+    """
     
     def __init__(
         self,
-        server_parameters: StdioServerParameters,
-        model: Callable[[List[Dict[str, Any]]], str],
+        server_parameters: Union["StdioServerParameters", Dict[str, "StdioServerParameters"]],
+        model: ModelFunction,
         system_prompt: Optional[str] = None,
         max_steps: int = 20,
         verbosity_level: int = logging.INFO,
+        session_factory: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+        tool_timeout: Optional[float] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        context_budget: Optional[ContextBudget] = None,
+        observation_store: Optional[ObservationStore] = None,
+        journal: Optional[StepJournal] = None,
+        tracer: Optional[Tracer] = None,
+        manifest_cache: Optional[ManifestCache] = None,
     ):
         self.server_parameters = server_parameters
         self.model = model
         self.max_steps = max_steps
+        self.session_factory = session_factory
+        self.tool_timeout = tool_timeout
+        self.tool_cache = tool_cache
+        self.context_budget = context_budget
+        self.observation_store = observation_store
+        self.journal = journal
+        self.tracer = tracer or Tracer()
+        self.manifest_cache = manifest_cache
+        self.tool_parser = ToolCallParser()
+        self.step_count = 0
         
         # Configure logger
         logger.setLevel(verbosity_level)
@@ -78,183 +166,399 @@ class MCPSimpleAgent:
         # Initialize system prompt and memory
         self.original_system_prompt = system_prompt or "You are an expert assistant who can solve tasks using tool calls."
         self.system_prompt = self.original_system_prompt
-        self.messages = []
+        self.messages = MessageStore()
         self.reset_memory()
         
         # Session state
         self.mcp_session = None
         self.available_tools = []
+        self.tool_index: Dict[str, Any] = {}
+        self._tools_version = None
+        self.cache_policies: Dict[str, CachePolicy] = {}
+    
+    @property
+    def messages(self) -> MessageStore:
+        """The conversation so far, as a list of {"role", "content"} dicts."""
+        return self._messages
+    
+    @messages.setter
+    def messages(self, messages: List[Dict[str, str]]):
+        self._messages = messages if isinstance(messages, MessageStore) else MessageStore(messages)
     
     def reset_memory(self):
         """Reset the agent's memory."""
-        self.messages = [{
+        self.messages = MessageStore([{
             "role": SYSTEM,
             "content": self.system_prompt
-        }]
+        }])
     
-    def add_message(self, role: str, content: str):
-        """Add a message to memory."""
-        # Replace system message if adding a new one
-        if role == SYSTEM:
-            self.messages = [m for m in self.messages if m["role"] != SYSTEM]
+    def add_message(self, role: str, content: str, **metadata):
+        """Add a message to memory.
         
-        self.messages.append({"role": role, "content": content})
+        Keyword arguments are extra metadata (such as timings) recorded with
+        the message in the journal, if there is one; they are not kept in memory.
+        """
+        message = {"role": role, "content": content}
+        # A new system message replaces the one the history starts with
+        if role == SYSTEM and self.messages and self.messages[0]["role"] == SYSTEM:
+            self.messages[0] = message
+        else:
+            self.messages.append(message)
+        if self.journal is not None:
+            self.journal.append({**message, "step": self.step_count, **metadata})
     
     def get_openai_messages(self) -> List[Dict[str, Any]]:
-        """Get messages in OpenAI format."""
-        return [
-            {
-                "role": m["role"],
-                "content": [{"type": "text", "text": m["content"]}]
-            }
-            for m in self.messages
-        ]
+        """Get messages in OpenAI format, fitted to the context budget if any.
+        
+        Each message's OpenAI payload and token count are cached in the
+        message store, so only messages added since the last call cost work.
+        """
+        return self.messages.openai_messages(self.context_budget)
     
     def _enhance_system_prompt_with_tools(self, tools) -> str:
-        """Enhance the system prompt with tool information."""
-        prompt = self.original_system_prompt.strip()
-        
-        # Add JSON format instructions
-        prompt += "\n\nYou must respond with a JSON object in the following format:\n"
-        prompt += "{\"name\": \"tool_name\", \"arguments\": {\"arg1\": \"value1\"}}\n\n"
+        """Enhance the system prompt with tool information.
         
-        # Add available tools
-        prompt += "Available tools:\n"
-        
-        # Add tool information
-        tool_names = [tool.name for tool in tools]
-        for tool in tools:
-            description = getattr(tool, 'description', f"Call the {tool.name} tool")
-            prompt += f"- {tool.name}: {description}\n"
-            parameters = getattr(tool, 'parameters', None)
-            if parameters:
-                prompt += f"Parameters: {parameters}\n"
-        
-        # Add final_answer if not already available
-        if "final_answer" not in tool_names:
-            prompt += "- final_answer(answer: str): Provide your final answer to the task\n"
+        The tool section comes first and is rendered deterministically from
+        the tools' names, descriptions and input schemas, so the start of the
+        prompt stays byte-identical across runs for provider prompt caching.
+        """
+        extra_help = READ_OBSERVATION_HELP if self.observation_store is not None else ""
+        return render_system_prompt(self.original_system_prompt, tools, extra_help)
+    
+    async def _call_model(self, messages: List[Dict[str, Any]]) -> str:
+        """Call the model without blocking the event loop.
+
+        Coroutine and async generator functions are called directly; plain
+        callables run in a worker thread. Streamed output is consumed only
+        until the tool calls in it are complete (see ToolCallScanner).
+        """
+        if is_async_model(self.model):
+            output = self.model(messages)
+        else:
+            output = await asyncio.to_thread(self.model, messages)
         
-        # Add examples
-        prompt += "\nExamples:\n"
-        if tools:
-            prompt += json.dumps({"name": tools[0].name, "arguments": {"city": "New York"}}) + "\n"
-        prompt += "{\"name\": \"final_answer\", \"arguments\": {\"answer\": \"Your comprehensive answer\"}}\n\n"
-        prompt += "IMPORTANT: Your response must be a valid JSON object with the format shown above.\n"
+        if inspect.isawaitable(output):
+            output = await output
+        if not hasattr(output, "__aiter__"):
+            return output
         
-        return prompt
+        scanner = ToolCallScanner(self.tool_parser)
+        try:
+            async for chunk in output:
+                if chunk and scanner.feed(chunk):
+                    break
+        finally:
+            aclose = getattr(output, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return scanner.text
     
     async def _process_step(self, step_count: int, max_steps: int):
         """Process a single agent step."""
         print("\n\n\n")
         logger.info(f"Step {step_count}/{max_steps}")
+        self.step_count = step_count
+        tracer = self.tracer
         
-        # Log messages
-        messages = self.get_openai_messages()
-        # logger.info(f"Sending messages to model: {json.dumps(messages, indent=2)}")
-        
-        start_time = time.time()
-        try:
-            # Call model and parse response
-            model_output = self.model(messages)
-            tool_name, tool_args = parse_json_tool_call(model_output)
-            print(f"\033[94mTool name:\033[0m {tool_name}")
-            print(f"\033[94mTool args:\033[0m {tool_args}")
-            
-            # Add assistant message
-            self.add_message(ASSISTANT, model_output)
+        with tracer.span("agent.step", step=step_count) as step_span:
+            await self._refresh_tools()
+            with tracer.span("prompt.build") as span:
+                messages = self.get_openai_messages()
+                if tracer.recording:
+                    span.set(
+                        messages=len(messages),
+                        prompt_chars=prompt_chars(messages),
+                    )
+                    if self.context_budget is not None:
+                        span.set(prompt_tokens=self.context_budget.last_tokens)
+            # logger.info(f"Sending messages to model: {json.dumps(messages, indent=2)}")
             
-            # Handle final answer or tool call
-            if tool_name == "final_answer":
-                final_answer = tool_args.get("answer", "")
-                observation = f"Final answer: {final_answer}"
-                print(f"\033[94mObservation:\033[0m {observation}")
-                self.add_message(USER, observation)
-                # Log final answer messages to file
-                # with open(f'agent/logs/messages_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl', 'w') as f:
-                #     for message in self.messages:
-                #         f.write(json.dumps(message))
-                #         f.write("\n")
-                return final_answer
-            
-            # Call tool
-            logger.info(f"Calling tool: {tool_name}")
-            if tool_name not in [t.name for t in self.available_tools.tools]:
-                raise ValueError(f"Tool not found: {tool_name}")
+            try:
+                # Call model and parse response
+                with tracer.span("model.call") as model_span:
+                    model_output = await self._call_model(messages)
+                    if tracer.recording:
+                        model_span.set(completion_chars=len(model_output))
+                        if self.context_budget is not None:
+                            model_span.set(completion_tokens=self.context_budget.counter.count(model_output))
+                with tracer.span("parse") as span:
+                    tool_calls = self.tool_parser.parse(model_output)
+                    span.set(calls=len(tool_calls), repairs=len(self.tool_parser.last_repairs))
+                for tool_name, tool_args in tool_calls:
+                    print(f"\033[94mTool name:\033[0m {tool_name}")
+                    print(f"\033[94mTool args:\033[0m {tool_args}")
                 
-            result = await self.mcp_session.call_tool(tool_name, tool_args)
-            print(f"Observation: {result.content[0].text}")
-            observation = result.content[0].text
-            self.add_message(USER, observation)
-            
-        except Exception as e:
-            error_msg = f"Error: {str(e)}\nPlease try a different approach."
-            logger.error(f"Error: {str(e)}")
-            self.add_message(USER, error_msg)
+                # Add assistant message
+                with tracer.span("log"):
+                    self.add_message(ASSISTANT, model_output, model_time=round(model_span.elapsed, 3))
+                
+                # Handle final answer, which ends the run even if other calls came with it
+                for tool_name, tool_args in tool_calls:
+                    if tool_name == "final_answer":
+                        if len(tool_calls) > 1:
+                            logger.warning("Skipping tool calls sent together with final_answer")
+                        final_answer = tool_args.get("answer", "")
+                        observation = f"Final answer: {final_answer}"
+                        print(f"\033[94mObservation:\033[0m {observation}")
+                        with tracer.span("log"):
+                            self.add_message(USER, observation, step_time=round(step_span.elapsed, 3))
+                        return final_answer
+                
+                # Call tools concurrently; each call captures its own errors
+                with tracer.span("tool.dispatch", calls=len(tool_calls)) as dispatch_span:
+                    observations = await asyncio.gather(*(
+                        self._call_tool(tool_name, tool_args) for tool_name, tool_args in tool_calls
+                    ))
+                if len(observations) == 1:
+                    observation = observations[0]
+                else:
+                    observation = "\n\n".join(
+                        f"Observation {i} ({tool_name}):\n{text}"
+                        for i, ((tool_name, _), text) in enumerate(zip(tool_calls, observations), start=1)
+                    )
+                print(f"Observation: {observation}")
+                with tracer.span("log", observation_chars=len(observation)):
+                    self.add_message(
+                        USER, observation,
+                        tool_time=round(dispatch_span.elapsed, 3),
+                        step_time=round(step_span.elapsed, 3),
+                    )
+                
+            except CacheMissError:
+                # Strict replay can't go on without the recorded response
+                step_span.set(error="CacheMissError")
+                raise
+            except Exception as e:
+                error_msg = f"Error: {str(e)}\nPlease try a different approach."
+                logger.error(f"Error: {str(e)}")
+                step_span.set(error=type(e).__name__)
+                with tracer.span("log"):
+                    self.add_message(USER, error_msg, step_time=round(step_span.elapsed, 3))
             
         return None
     
+    async def _call_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> str:
+        """Call a single tool and return its observation text.
+        
+        Errors and timeouts are returned as the observation rather than raised,
+        so one failing call does not lose the results of calls made alongside it.
+        """
+        logger.info(f"Calling tool: {tool_name}")
+        with self.tracer.span("tool.call", tool=tool_name) as span:
+            try:
+                if tool_name == READ_OBSERVATION and self.observation_store is not None:
+                    return self.observation_store.read(**tool_args)
+                if tool_name not in self.tool_index:
+                    raise ValueError(f"Tool not found: {tool_name}")
+                
+                # Catch bad arguments here rather than in an MCP round trip
+                tool_args = self.tool_parser.validate(tool_name, tool_args)
+                if self.tracer.recording:
+                    span.set(argument_bytes=len(json.dumps(tool_args)))
+                
+                # Serve repeated calls of cacheable tools from the cache
+                policy = self.cache_policies.get(tool_name) if self.tool_cache is not None else None
+                cache_key = await self.tool_cache.key(tool_name, tool_args, policy) if policy else None
+                if cache_key:
+                    cached = self.tool_cache.get(cache_key)
+                    if cached is not None:
+                        logger.info(f"Cache hit for tool: {tool_name}")
+                        span.set(cached=True, result_chars=len(cached))
+                        return self._spill(cached)
+                
+                # Long-running tools may stream progress back while they run
+                async def on_progress(progress: float, total: Optional[float], message: Optional[str]):
+                    if message:
+                        logger.info(f"{tool_name}: {message}")
+                
+                with self.tracer.span("mcp.call_tool", tool=tool_name):
+                    result = await asyncio.wait_for(
+                        self.mcp_session.call_tool(tool_name, tool_args, progress_callback=on_progress),
+                        timeout=self.tool_timeout,
+                    )
+                observation = result.content[0].text
+                span.set(result_chars=len(observation))
+                if result.isError:
+                    span.set(error="ToolError")
+                elif cache_key:
+                    self.tool_cache.put(cache_key, observation, policy)
+                return self._spill(observation)
+            except asyncio.TimeoutError:
+                span.set(error="TimeoutError")
+                logger.error(f"Tool {tool_name} timed out after {self.tool_timeout}s")
+                return f"Error: Tool {tool_name} timed out after {self.tool_timeout}s\nPlease try a different approach."
+            except Exception as e:
+                span.set(error=type(e).__name__)
+                logger.error(f"Error: {str(e)}")
+                return f"Error: {str(e)}\nPlease try a different approach."
+    
+    def _spill(self, observation: str) -> str:
+        """Replace a large observation with a preview and a handle to read the rest."""
+        if self.observation_store is None:
+            return observation
+        return self.observation_store.store(observation)
+    
+    def _open_session(self) -> AsyncContextManager[Any]:
+        """Open an initialized MCP session for a run.
+        
+        Uses `session_factory` when one was given (for example to attach to a
+        warm daemon session), otherwise spawns the server over stdio, or all
+        of the servers behind a router.
+        """
+        if self.session_factory is not None:
+            return self.session_factory()
+        if isinstance(self.server_parameters, dict):
+            from sessions import ServerRouter
+            return ServerRouter(self.server_parameters)
+        from sessions import open_stdio_session
+        return open_stdio_session(self.server_parameters)
+    
+    async def _start_session(self, session, span=None):
+        """Attach an open MCP session and load its tools."""
+        self.mcp_session = session
+        await self._load_tools(span)
+    
+    async def _load_tools(self, span=None):
+        """Load the session's tools into the tool index."""
+        # Get tools, from the manifest cache while the server script is unchanged
+        tools = None
+        cacheable = self.manifest_cache is not None and not isinstance(self.server_parameters, dict)
+        if cacheable:
+            tools = self.manifest_cache.get(self.server_parameters)
+            if span is not None:
+                span.set(manifest_cache_hit=int(tools is not None))
+        if tools is None:
+            tools = await self.mcp_session.list_tools()
+            if cacheable:
+                self.manifest_cache.put(self.server_parameters, tools)
+        self.available_tools = tools
+        self.tool_index = {tool.name: tool for tool in tools.tools}
+        self._tools_version = getattr(self.mcp_session, "version", None)
+        logger.info(f"Available tools: {', '.join(self.tool_index)}")
+        self.cache_policies = {
+            name: policy
+            for name, tool in self.tool_index.items()
+            if (policy := CachePolicy.from_tool(tool)) is not None
+        }
+        self.tool_parser.set_schemas({name: tool.inputSchema for name, tool in self.tool_index.items()})
+    
+    async def _refresh_tools(self):
+        """Pick up tools of servers that joined after the run started."""
+        if getattr(self.mcp_session, "version", None) == self._tools_version:
+            return
+        await self._load_tools()
+        self.system_prompt = self._enhance_system_prompt_with_tools(self.available_tools.tools)
+        self.messages[0] = {"role": SYSTEM, "content": self.system_prompt}
+        logger.info("Tools changed; updated the system prompt")
+    
+    async def _run_steps(self, first_step: int, max_steps: int):
+        """Run the agent loop from a step number until a final answer or max_steps."""
+        step_count = first_step - 1
+        final_answer = None
+        
+        while step_count < max_steps and final_answer is None:
+            step_count += 1
+            final_answer = await self._process_step(step_count, max_steps)
+        
+        if step_count >= max_steps and final_answer is None:
+            logger.warning(f"Reached maximum steps ({max_steps}) without final answer")
+            final_answer = "No final answer provided within the maximum number of steps."
+        
+        if self.tool_cache is not None:
+            logger.info(f"Tool cache: {self.tool_cache.stats()}")
+        logger.info(f"Tool call parser: {self.tool_parser.stats()}")
+        if self.manifest_cache is not None:
+            logger.info(f"Tool manifest cache: {self.manifest_cache.stats()}")
+        
+        return final_answer
+    
     async def run(self, task: str, reset: bool = True, max_steps: Optional[int] = None):
         """Run the agent on a task."""
         if reset:
             self.reset_memory()
         
         logger.info("Initializing MCP session...")
-        async with stdio_client(self.server_parameters) as (read_stream, write_stream):
-            async with ClientSession(read_stream, write_stream) as session:
-                self.mcp_session = session
-                
-                # Initialize session and get tools
-                await self.mcp_session.initialize()
-                self.available_tools = await self.mcp_session.list_tools()
-                tool_names = [tool.name for tool in self.available_tools.tools]
-                logger.info(f"Available tools: {', '.join(tool_names)}")
+        with self.tracer.span("agent.run") as run_span:
+            async with self._open_session() as session:
+                with self.tracer.span("session.start") as span:
+                    await self._start_session(session, span)
                 
                 # Update system prompt with tools and reset memory
                 self.system_prompt = self._enhance_system_prompt_with_tools(self.available_tools.tools)
                 print(f"System prompt: {self.system_prompt}")
                 self.reset_memory()
+                self.step_count = 0
+                if self.journal is not None:
+                    self.journal.append({**self.messages[0], "step": 0})
                 self.add_message(USER, task)
                 
-                # Log memory state
-                logger.info(f"Memory: {json.dumps(self.messages, indent=2)}")
+                # Log memory state; the system prompt alone is long, so only when debugging
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Memory: {json.dumps(self.messages, indent=2)}")
                 
                 # Run agent loop
-                max_steps = max_steps or self.max_steps
-                step_count = 0
-                final_answer = None
-                
-                while step_count < max_steps and final_answer is None:
-                    step_count += 1
-                    final_answer = await self._process_step(step_count, max_steps)
-                
-                if step_count >= max_steps and final_answer is None:
-                    logger.warning(f"Reached maximum steps ({max_steps}) without final answer")
-                    final_answer = "No final answer provided within the maximum number of steps."
-                
-                return final_answer
+                result = await self._run_steps(1, max_steps or self.max_steps)
+                run_span.set(steps=self.step_count)
+                return result
+    
+    async def resume(self, messages: List[Dict[str, str]], max_steps: Optional[int] = None):
+        """Continue a run from the messages recorded in its journal or log.
+        
+        Completed steps are kept as they are, including the recorded system
+        prompt. A model response whose observation was never recorded is
+        dropped, so that step is run again.
+        """
+        messages = list(messages)
+        if messages and messages[-1]["role"] == ASSISTANT:
+            messages.pop()
+        if len(messages) < 2 or messages[0]["role"] != SYSTEM:
+            raise ValueError("Cannot resume: log does not start with a system prompt and task")
+        
+        # Nothing to do if the recorded run already ended with a final answer
+        last = messages[-1]["content"]
+        if last.startswith("Final answer: "):
+            self.messages = messages
+            return last[len("Final answer: "):]
+        
+        self.messages = messages
+        self.system_prompt = messages[0]["content"]
+        completed = sum(1 for m in messages if m["role"] == ASSISTANT)
+        logger.info(f"Resuming after step {completed}")
+        
+        logger.info("Initializing MCP session...")
+        with self.tracer.span("agent.run", resumed_after=completed) as run_span:
+            async with self._open_session() as session:
+                with self.tracer.span("session.start") as span:
+                    await self._start_session(session, span)
+                result = await self._run_steps(completed + 1, max_steps or self.max_steps)
+                run_span.set(steps=self.step_count)
+                return result
     
     @classmethod
     def create_with_openai(cls, 
-                          server_parameters: StdioServerParameters,
+                          server_parameters: Union["StdioServerParameters", Dict[str, "StdioServerParameters"]],
                           system_prompt: Optional[str] = None,
                           model: str = "gpt-4o-mini",
                           temperature: float = 0.7,
                           max_tokens: int = 2048,
                           api_key: Optional[str] = None,
                           max_steps: int = 20,
-                          verbosity_level: int = logging.INFO) -> 'MCPSimpleAgent':
+                          verbosity_level: int = logging.INFO,
+                          session_factory: Optional[Callable[[], AsyncContextManager[Any]]] = None,
+                          tool_timeout: Optional[float] = None,
+                          tool_cache: Optional[ToolResultCache] = None,
+                          response_cache: Optional[ResponseCache] = None,
+                          context_budget: Optional[ContextBudget] = None,
+                          observation_store: Optional[ObservationStore] = None,
+                          journal: Optional[StepJournal] = None,
+                          tracer: Optional[Tracer] = None,
+                          manifest_cache: Optional[ManifestCache] = None,
+                          scheduler: Optional[RequestScheduler] = None) -> 'MCPSimpleAgent':
         """Create an MCPSimpleAgent that uses OpenAI for its model."""
-        if not OPENAI_AVAILABLE:
-            raise ImportError("OpenAI package is not installed. Please install it with 'pip install openai'.")
-        
-        # Create the OpenAI client and model function
-        client = OpenAI(api_key=api_key)
-        def model_function(messages):
-            response = client.chat.completions.create(
-                model=model, messages=messages, temperature=temperature,
-                max_tokens=max_tokens, response_format={"type": "json_object"}
-            )
-            return response.choices[0].message.content
+        model_function = create_openai_model(
+            model=model, temperature=temperature, max_tokens=max_tokens, api_key=api_key,
+            response_cache=response_cache, scheduler=scheduler,
+        )
         
         return cls(
             server_parameters=server_parameters,
@@ -262,4 +566,12 @@ class MCPSimpleAgent:
             system_prompt=system_prompt,
             max_steps=max_steps,
             verbosity_level=verbosity_level,
+            session_factory=session_factory,
+            tool_timeout=tool_timeout,
+            tool_cache=tool_cache,
+            context_budget=context_budget,
+            observation_store=observation_store,
+            journal=journal,
+            tracer=tracer,
+            manifest_cache=manifest_cache,
         ) 
\ No newline at end of file
@@ -2,6 +2,7 @@ import { NextResponse } from "next/server"
 import fs from "fs"
 import path from "path"
 import os from "os"
+import { isLogFile } from "@/lib/compact-log"
 
 // Define base directories to check for logs
 const BASE_DIRECTORIES = [
@@ -23,14 +24,14 @@ export async function GET() {
     const projectRoot = process.cwd()
     const availableDirs = []
 
-    // Check which local directories exist and contain .jsonl files
+    // Check which local directories exist and contain log files
     for (const dir of BASE_DIRECTORIES) {
       const dirPath = path.join(projectRoot, dir)
       
       if (fs.existsSync(dirPath)) {
         try {
           const files = fs.readdirSync(dirPath)
-          const hasJsonlFiles = files.some(file => file.endsWith('.jsonl'))
+          const hasJsonlFiles = files.some(isLogFile)
           
           if (hasJsonlFiles) {
             availableDirs.push(dir)
@@ -46,7 +47,7 @@ export async function GET() {
       if (fs.existsSync(extDir.path)) {
         try {
           const files = fs.readdirSync(extDir.path)
-          const hasJsonlFiles = files.some(file => file.endsWith('.jsonl'))
+          const hasJsonlFiles = files.some(isLogFile)
           
           if (hasJsonlFiles) {
             availableDirs.push(extDir.id)
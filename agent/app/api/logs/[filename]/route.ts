@@ -3,6 +3,8 @@ import fs from "fs"
 import path from "path"
 import os from "os"
 import type { ConversationMessage } from "@/lib/types"
+import { queryLogIndex } from "@/lib/log-index"
+import { COMPACT_SUFFIX, readCompactLog } from "@/lib/compact-log"
 
 // Map of special directory IDs to their absolute paths
 const EXTERNAL_DIRECTORIES: Record<string, string> = {
@@ -31,6 +33,10 @@ export async function GET(request: Request, { params }: { params: { filename: st
     }
     
     const filename = params.filename
+    // Validate filename to prevent directory traversal attacks
+    if (filename.includes('..') || filename.includes('/') || filename.includes('\\')) {
+      return NextResponse.json({ error: "Invalid filename" }, { status: 400 })
+    }
     const filePath = path.join(logsDir, filename)
 
     // Check if file exists
@@ -38,6 +44,25 @@ export async function GET(request: Request, { params }: { params: { filename: st
       return NextResponse.json({ error: "Log file not found" }, { status: 404 })
     }
 
+    // Read just the requested range of messages through the log index
+    const start = url.searchParams.get('start')
+    const limit = url.searchParams.get('limit')
+    const args = ['messages', logsDir, filename]
+    if (start) {
+      args.push('--start', start)
+    }
+    if (limit) {
+      args.push('--limit', limit)
+    }
+    const index = await queryLogIndex<{ total: number, messages: ConversationMessage[] }>(args)
+    if (index) {
+      return NextResponse.json(index)
+    }
+
+    if (filename.endsWith(COMPACT_SUFFIX)) {
+      return NextResponse.json({ messages: readCompactLog(filePath) })
+    }
+
     const fileContent = fs.readFileSync(filePath, "utf-8")
 
     // Parse JSONL content
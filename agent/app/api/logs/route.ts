@@ -2,12 +2,23 @@ import { NextResponse } from "next/server"
 import fs from "fs"
 import path from "path"
 import os from "os"
+import { queryLogIndex } from "@/lib/log-index"
+import { isLogFile } from "@/lib/compact-log"
 
 // Map of special directory IDs to their absolute paths
 const EXTERNAL_DIRECTORIES: Record<string, string> = {
   "ai-agent-logs": path.join(os.homedir(), "Library/Application Support/AI-Agent-CLI/logs")
 }
 
+// Runs listed per request unless the client asks for another page size
+const DEFAULT_PAGE_SIZE = 50
+const MAX_PAGE_SIZE = 500
+
+function pageParam(value: string | null, fallback: number, max: number): number {
+  const parsed = Number.parseInt(value ?? "", 10)
+  return Number.isNaN(parsed) || parsed < 0 ? fallback : Math.min(parsed, max)
+}
+
 export async function GET(request: Request) {
   try {
     // Get the directory from the query parameters
@@ -31,12 +42,25 @@ export async function GET(request: Request) {
 
     // Check if directory exists
     if (!fs.existsSync(logsDir)) {
-      return NextResponse.json({ logs: [] })
+      return NextResponse.json({ logs: [], total: 0 })
+    }
+
+    // Paging and optional search, served from the log index
+    const offset = pageParam(url.searchParams.get('offset'), 0, Number.MAX_SAFE_INTEGER)
+    const limit = pageParam(url.searchParams.get('limit'), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    const query = url.searchParams.get('q')
+    const args = ['list', logsDir, '--offset', String(offset), '--limit', String(limit)]
+    if (query) {
+      args.push('--query', query)
+    }
+    const index = await queryLogIndex<{ total: number, runs: { filename: string }[] }>(args)
+    if (index) {
+      return NextResponse.json({ logs: index.runs.map((run) => run.filename), runs: index.runs, total: index.total })
     }
 
-    const files = fs.readdirSync(logsDir).filter((file) => file.endsWith(".jsonl"))
+    const files = fs.readdirSync(logsDir).filter(isLogFile).sort().reverse()
 
-    return NextResponse.json({ logs: files })
+    return NextResponse.json({ logs: files.slice(offset, offset + limit), total: files.length })
   } catch (error) {
     console.error("Error reading logs directory:", error)
     return NextResponse.json({ error: "Failed to read logs" }, { status: 500 })
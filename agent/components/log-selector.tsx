@@ -16,6 +16,9 @@ import {
 } from "@/components/ui/alert-dialog"
 import { toast } from "@/components/ui/use-toast"
 
+// Runs fetched per page; more are loaded on request
+const PAGE_SIZE = 50
+
 interface LogSelectorProps {
   onSelectLog: (logFile: string) => void
   selectedLog?: string
@@ -24,21 +27,29 @@ interface LogSelectorProps {
 
 export function LogSelector({ onSelectLog, selectedLog, directory }: LogSelectorProps) {
   const [logFiles, setLogFiles] = useState<string[]>([])
+  const [total, setTotal] = useState(0)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [deleteDialogOpen, setDeleteDialogOpen] = useState(false)
   const [fileToDelete, setFileToDelete] = useState<string | null>(null)
   const [isDeleting, setIsDeleting] = useState(false)
 
-  const fetchLogFiles = async () => {
-    setLoading(true)
+  // Fetch a page of log files, replacing the list or, with an offset, adding to it
+  const fetchLogFiles = async (offset = 0) => {
+    const setBusy = offset ? setLoadingMore : setLoading
+    setBusy(true)
     try {
-      const response = await fetch(`/api/logs?directory=${encodeURIComponent(directory)}`)
+      const response = await fetch(
+        `/api/logs?directory=${encodeURIComponent(directory)}&offset=${offset}&limit=${PAGE_SIZE}`
+      )
       const data = await response.json()
-      setLogFiles(data.logs)
+      const logs: string[] = data.logs ?? []
+      setLogFiles((previous) => (offset ? [...previous, ...logs] : logs))
+      setTotal(data.total ?? offset + logs.length)
     } catch (error) {
       console.error("Failed to fetch log files:", error)
     } finally {
-      setLoading(false)
+      setBusy(false)
     }
   }
 
@@ -143,6 +154,16 @@ export function LogSelector({ onSelectLog, selectedLog, directory }: LogSelector
               </Button>
             </div>
           ))}
+          {logFiles.length < total && (
+            <Button
+              variant="outline"
+              className="w-full text-sm"
+              onClick={() => fetchLogFiles(logFiles.length)}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Loading..." : `Load more (${total - logFiles.length} remaining)`}
+            </Button>
+          )}
         </div>
       )}
 
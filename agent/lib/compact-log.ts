@@ -0,0 +1,48 @@
+import fs from "fs"
+import path from "path"
+import zlib from "zlib"
+import type { ConversationMessage } from "@/lib/types"
+
+// Compact logs (compact_log.py at the repository root) are gzip-compressed
+// JSON lines in which large contents, such as the system prompt, are stored
+// once per logs directory as zlib-compressed blobs under blobs/, named by
+// their SHA-256 and referenced by a "blob" field.
+export const COMPACT_SUFFIX = ".tlog"
+export const LOG_SUFFIXES = [".jsonl", COMPACT_SUFFIX]
+
+export function isLogFile(filename: string): boolean {
+  return LOG_SUFFIXES.some((suffix) => filename.endsWith(suffix))
+}
+
+/**
+ * Read the messages of a compact log, resolving blob references from the
+ * blob store in the log's directory.
+ */
+export function readCompactLog(filePath: string): ConversationMessage[] {
+  const blobsDir = path.join(path.dirname(filePath), "blobs")
+  const blobs = new Map<string, string>()
+  const readBlob = (digest: string): string => {
+    let text = blobs.get(digest)
+    if (text === undefined) {
+      const blobPath = path.join(blobsDir, digest.slice(0, 2), digest.slice(2))
+      text = fs.existsSync(blobPath)
+        ? zlib.inflateSync(fs.readFileSync(blobPath)).toString("utf-8")
+        : `[missing blob ${digest}]`
+      blobs.set(digest, text)
+    }
+    return text
+  }
+
+  return zlib
+    .gunzipSync(fs.readFileSync(filePath))
+    .toString("utf-8")
+    .split("\n")
+    .filter((line) => line.trim())
+    .map((line) => {
+      const record = JSON.parse(line)
+      return {
+        role: record.role,
+        content: record.blob !== undefined ? readBlob(record.blob) : record.content,
+      }
+    })
+}
@@ -0,0 +1,31 @@
+import { execFile } from "child_process"
+import path from "path"
+
+// The Python log indexer (log_index.py at the repository root) keeps a SQLite
+// index of each logs directory, so runs can be listed, searched and read in
+// slices without reading every file. Override the paths with LOG_INDEXER and
+// PYTHON if the viewer is run from elsewhere.
+const LOG_INDEXER = process.env.LOG_INDEXER || path.join(process.cwd(), "..", "log_index.py")
+const PYTHON = process.env.PYTHON || "python3"
+
+/**
+ * Run a log indexer command and parse its JSON output.
+ * Returns null if the indexer is unavailable or fails, so callers can fall
+ * back to reading the log files directly.
+ */
+export function queryLogIndex<T>(args: string[]): Promise<T | null> {
+  return new Promise((resolve) => {
+    execFile(PYTHON, [LOG_INDEXER, ...args], { maxBuffer: 64 * 1024 * 1024 }, (error, stdout) => {
+      if (error) {
+        console.error("Log indexer unavailable, reading log files directly:", error.message)
+        resolve(null)
+        return
+      }
+      try {
+        resolve(JSON.parse(stdout) as T)
+      } catch {
+        resolve(null)
+      }
+    })
+  })
+}
@@ -7,89 +7,304 @@ import argparse
 import json
 from datetime import datetime
 from pathlib import Path
-from mcp import StdioServerParameters
-from dotenv import load_dotenv
 import tempfile
 import shutil
 
 # Import the agent components
-from agent import MCPSimpleAgent
+from agent import ASSISTANT, MCPSimpleAgent
+from compact_log import COMPACT_SUFFIX, convert, is_compact, read_messages, write_compact_log
+from context_budget import ContextBudget
+from journal import StepJournal
+from log_index import index_log
+from observations import ObservationStore
+from response_cache import ResponseCache
+from scheduler import RequestScheduler
+from telemetry import BufferSink, JsonLinesSink, OTLPJsonSink, Tracer
+from tool_cache import ToolResultCache
+from tool_manifest import ManifestCache
 
-# Load environment variables from .env file
-load_dotenv()
+# Heavy dependencies (mcp, openai, dotenv) and the daemon client are imported
+# where they are needed, so `agent --help` and argument errors return quickly.
 
-# Get API key from environment
-api_key = os.environ.get("OPENAI_API_KEY")
+def get_api_key():
+    """Get the OpenAI API key from the environment or a .env file.
+    
+    Returns:
+        str: The API key, or None if it is not set
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    return os.environ.get("OPENAI_API_KEY")
 
-def get_logs_directory():
-    """Get or create a centralized logs directory.
+def get_base_directory():
+    """Get the platform-specific application data directory.
     
     Returns:
-        Path: Path to the logs directory
+        str: Path to the application data directory
     """
-    # Use platform-specific app data directory
     if sys.platform == 'win32':
-        base_dir = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'AI-Agent-CLI')
+        return os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'AI-Agent-CLI')
     elif sys.platform == 'darwin':
-        base_dir = os.path.expanduser('~/Library/Application Support/AI-Agent-CLI')
+        return os.path.expanduser('~/Library/Application Support/AI-Agent-CLI')
     else:  # Linux and other Unix-like
-        base_dir = os.path.expanduser('~/.ai-agent-cli')
+        return os.path.expanduser('~/.ai-agent-cli')
+
+def get_logs_directory():
+    """Get or create a centralized logs directory.
     
+    Returns:
+        Path: Path to the logs directory
+    """
     # Create logs directory
-    logs_dir = os.path.join(base_dir, 'logs')
+    logs_dir = os.path.join(get_base_directory(), 'logs')
     os.makedirs(logs_dir, exist_ok=True)
     
     return logs_dir
 
-def save_logs(agent, logs_dir):
+def save_logs(agent, logs_dir, name=None, log_format="jsonl"):
     """Save agent messages to a log file.
     
+    If the agent journaled its messages while running, the journal already
+    is the log file; it is closed and its path returned. Either way the log
+    is added to the logs directory's index.
+    
     Args:
         agent: The agent instance
         logs_dir: Directory to save logs
+        name: Optional file name suffix, needed when several runs finish within
+              the same second. Defaults to the current timestamp.
+        log_format: "jsonl", or "compact" to store the log deduplicated and
+                    compressed (see compact_log.py)
+    
+    Returns:
+        str: Path to the log file, or None if saving failed
     """
+    journal = getattr(agent, "journal", None)
+    if journal is not None:
+        journal.close()
+        log_file = journal.path
+        if log_format == "compact":
+            try:
+                log_file = convert(journal.path, remove=True)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Failed to compact log {journal.path}: {e}")
+        logging.info(f"Logs saved to {log_file}")
+        index_log(log_file)
+        return log_file
+    
     try:
         # Create a timestamped log file
-        log_file = os.path.join(logs_dir, f'messages_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl')
-        
-        # Save messages to the log file
-        with open(log_file, 'w') as f:
-            for message in agent.messages:
-                f.write(json.dumps(message))
-                f.write("\n")
+        name = name or datetime.now().strftime("%Y%m%d_%H%M%S")
+        if log_format == "compact":
+            log_file = write_compact_log(
+                os.path.join(logs_dir, f'messages_{name}{COMPACT_SUFFIX}'), agent.messages
+            )
+        else:
+            log_file = os.path.join(logs_dir, f'messages_{name}.jsonl')
+            
+            # Save messages to the log file
+            with open(log_file, 'w') as f:
+                for message in agent.messages:
+                    f.write(json.dumps(message))
+                    f.write("\n")
         
         logging.info(f"Logs saved to {log_file}")
+        index_log(log_file)
+        return log_file
     except Exception as e:
         logging.warning(f"Failed to save logs: {e}")
+        return None
+
+def get_socket_path():
+    """Get the default Unix socket path for the agent daemon.
+    
+    Returns:
+        str: Path to the daemon socket
+    """
+    base_dir = get_base_directory()
+    os.makedirs(base_dir, exist_ok=True)
+    return os.path.join(base_dir, 'agent.sock')
+
+def get_tool_cache():
+    """Get the persistent tool result cache.
+    
+    Returns:
+        ToolResultCache: Cache backed by a file in the app data directory
+    """
+    base_dir = get_base_directory()
+    os.makedirs(base_dir, exist_ok=True)
+    return ToolResultCache(path=os.path.join(base_dir, 'tool_cache.json'))
+
+def get_manifest_cache():
+    """Get the persistent cache of servers' tool manifests.
+    
+    Returns:
+        ManifestCache: Cache backed by a file in the app data directory
+    """
+    base_dir = get_base_directory()
+    os.makedirs(base_dir, exist_ok=True)
+    return ManifestCache(path=os.path.join(base_dir, 'tool_manifest.json'))
+
+def get_response_cache(directory: str = None, replay: bool = False):
+    """Get the on-disk model response cache.
+    
+    Args:
+        directory: Optional cache directory. Defaults to one in the app data directory.
+        replay: Raise on cache misses instead of calling the model
+    
+    Returns:
+        ResponseCache: The response cache
+    """
+    directory = directory or os.path.join(get_base_directory(), 'llm_cache')
+    return ResponseCache(os.path.expanduser(directory), replay=replay)
+
+def get_server_environment(persistent_shell: bool = False) -> dict:
+    """Environment settings to pass on to an MCP server.
+    
+    The stdio client only passes a few basic variables (HOME, PATH, ...) on
+    to the servers it starts, so the server's own settings, the AGENT_*
+    variables (command and Aider limits, weather lookups), are copied here.
+    """
+    env = {name: value for name, value in os.environ.items() if name.startswith("AGENT_")}
+    if persistent_shell:
+        env["AGENT_PERSISTENT_SHELL"] = "1"
+    return env
+
+def get_server_parameters(server_script_path: str = None, persistent_shell: bool = False):
+    """Build the MCP server parameters for a server script.
+    
+    Args:
+        server_script_path: Optional path to the server script. If not provided,
+                           will look for server.py in the same directory as this script.
+        persistent_shell: Run terminal commands in one long-lived shell per
+                         server, so cd and exports carry over between them
+    
+    Returns:
+        StdioServerParameters: Parameters to launch the server over stdio
+    """
+    # If server_script_path is not provided, use the default path
+    if not server_script_path:
+        # Get the directory of the current script
+        script_dir = Path(__file__).parent.absolute()
+        server_script_path = script_dir / "server.py"
+    else:
+        server_script_path = Path(server_script_path).expanduser().resolve()
+    
+    # Ensure the server script exists
+    if not server_script_path.exists():
+        raise FileNotFoundError(f"Server script not found at {server_script_path}")
+    
+    # Define MCP server parameters with the absolute path to the server script
+    from mcp import StdioServerParameters
+    return StdioServerParameters(
+        command="python",
+        args=[str(server_script_path)],
+        env=get_server_environment(persistent_shell) or None,
+    )
+
+def get_servers(server_script_path: str = None, extra_servers: list = None, persistent_shell: bool = False):
+    """Build the parameters of the main server and any extra servers, by name.
+    
+    Args:
+        server_script_path: Optional path to the main server script
+        extra_servers: Extra server scripts as `NAME=PATH` or `PATH`; the name
+                      defaults to the script's file name without extension
+        persistent_shell: Run the main server's terminal commands in a persistent shell
+    
+    Returns:
+        dict: StdioServerParameters keyed by server name
+    """
+    specs = [str(server_script_path or Path(__file__).parent.absolute() / "server.py")] + list(extra_servers or [])
+    servers = {}
+    for spec in specs:
+        name, _, path = spec.rpartition("=")
+        name = name or Path(path).stem
+        if name in servers:
+            raise ValueError(f"Duplicate server name: {name} (use NAME=PATH to rename one)")
+        # Only the main server, the first, gets the persistent shell
+        servers[name] = get_server_parameters(path, persistent_shell and not servers)
+    return servers
+
+def build_system_prompt(cwd: str = None):
+    """Build the agent's system prompt for a working directory.
+    
+    Args:
+        cwd: The working directory to mention. Defaults to the current one.
+    
+    Returns:
+        str: The system prompt
+    """
+    # Define a system prompt for the agent
+    system_prompt = """
+    You are an expert AI agent. 
+    You are given a task and you need to complete it using the tools available.
+    You are currently working in the directory: {cwd}
+    """
+    
+    # Add current working directory to the system prompt
+    return system_prompt.format(cwd=cwd or os.getcwd())
 
 class SimpleAgent(MCPSimpleAgent):
     """A wrapper around MCPSimpleAgent that adds centralized logging."""
     
-    def __init__(self, logs_dir=None, *args, **kwargs):
+    def __init__(self, logs_dir=None, *args, log_format="jsonl", **kwargs):
         super().__init__(*args, **kwargs)
         self.logs_dir = logs_dir or get_logs_directory()
+        self.log_format = log_format
         
         # Create logs directory if it doesn't exist
         os.makedirs(self.logs_dir, exist_ok=True)
     
     @classmethod
-    def create_with_openai(cls, logs_dir=None, **kwargs):
+    def create_with_openai(cls, logs_dir=None, log_format="jsonl", **kwargs):
         """Create an agent with OpenAI integration and logging support."""
         agent = super().create_with_openai(**kwargs)
         agent.__class__ = cls  # Change the class of the instance
         agent.logs_dir = logs_dir or get_logs_directory()
+        agent.log_format = log_format
         
         return agent
     
-    async def run(self, query):
-        """Run the agent with a query and save logs."""
-        # Run the agent
-        result = await super().run(query)
-        # Save logs after running
-        save_logs(self, self.logs_dir)
-        return result
+    async def run(self, query, resume=None):
+        """Run the agent with a query, journaling each step to the logs directory.
+        
+        Args:
+            query: The query to send to the agent
+            resume: Optional path to the log of an interrupted run to continue
+                    instead of starting a new one. The log is appended to.
+        """
+        if resume and is_compact(resume):
+            # Journal to a new .jsonl beside the compact log, which is rewritten
+            # at the end. A final model response with no observation is left
+            # out, as the step is run again.
+            messages = read_messages(resume)
+            if messages and messages[-1]["role"] == ASSISTANT:
+                messages.pop()
+            self.journal = StepJournal(os.path.splitext(resume)[0] + ".jsonl", truncate=True).open()
+            for message in messages:
+                self.journal.append(message)
+        elif resume:
+            messages = StepJournal.recover(resume)
+            self.journal = StepJournal(resume).open()
+        else:
+            name = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.journal = StepJournal(os.path.join(self.logs_dir, f'messages_{name}.jsonl')).open()
+        
+        try:
+            if resume:
+                return await super().resume(messages)
+            return await super().run(query)
+        finally:
+            # Flush the journal, even if the run failed or was interrupted
+            save_logs(self, self.logs_dir, log_format=self.log_format)
 
-async def run_agent(query: str, server_script_path: str = None, logs_dir: str = None):
+async def run_agent(query: str, server_script_path: str = None, logs_dir: str = None,
+                    socket_path: str = None, use_daemon: bool = True, tool_timeout: float = None,
+                    cache_tools: bool = False, response_cache: ResponseCache = None,
+                    context_tokens: int = 100000, spill_threshold: int = 20000,
+                    resume: str = None, trace_file: str = None, otel_file: str = None,
+                    extra_servers: list = None, scheduler: RequestScheduler = None,
+                    log_format: str = "jsonl", persistent_shell: bool = False):
     """Run the agent with a query.
     
     Args:
@@ -98,7 +313,28 @@ async def run_agent(query: str, server_script_path: str = None, logs_dir: str =
                            will look for server.py in the same directory as this script.
         logs_dir: Optional directory to store logs. If not provided,
                  will use a platform-specific default location.
+        socket_path: Optional path to the daemon socket. If not provided,
+                    will use the default location.
+        use_daemon: Attach to a running daemon for this server if there is one,
+                   instead of spawning the server for this run.
+        tool_timeout: Optional timeout in seconds for each tool call
+        cache_tools: Reuse results of cacheable tool calls from earlier runs
+        response_cache: Optional cache to record and replay model responses
+        context_tokens: Token budget for the context sent to the model each step
+        spill_threshold: Observations longer than this many characters are
+                        spilled to disk and shown as a preview
+        resume: Optional path to the log of an interrupted run to continue
+        trace_file: Optional file to append timing spans to as JSON lines
+        otel_file: Optional file to append timing spans to in OTLP/JSON format
+        extra_servers: Optional extra server scripts (`NAME=PATH` or `PATH`) whose
+                      tools are offered alongside the main server's
+        scheduler: Optional scheduler to keep model calls within rate limits
+        log_format: "jsonl", or "compact" for deduplicated, compressed logs
+        persistent_shell: Run terminal commands in one shell for the whole run,
+                         so cd and exports carry over between them
     """
+    import daemon
+    
     # If logs_dir is provided, ensure it exists
     if logs_dir:
         logs_dir = Path(logs_dir).expanduser().resolve()
@@ -106,57 +342,103 @@ async def run_agent(query: str, server_script_path: str = None, logs_dir: str =
     else:
         logs_dir = get_logs_directory()
     
-    # If server_script_path is not provided, use the default path
-    if not server_script_path:
-        # Get the directory of the current script
-        script_dir = Path(__file__).parent.absolute()
-        server_script_path = script_dir / "server.py"
+    # Several servers are combined behind a router; the daemon serves only one
+    if extra_servers:
+        server_parameters = get_servers(server_script_path, extra_servers, persistent_shell)
+        use_daemon = False
     else:
-        server_script_path = Path(server_script_path)
-    
-    # Ensure the server script exists
-    if not server_script_path.exists():
-        raise FileNotFoundError(f"Server script not found at {server_script_path}")
+        server_parameters = get_server_parameters(server_script_path, persistent_shell)
+    # A daemon's warm sessions are shared by runs, and so would be their shell
+    if persistent_shell:
+        use_daemon = False
     
-    # Define MCP server parameters with the absolute path to the server script
-    server_parameters = StdioServerParameters(
-        command="python",
-        args=[str(server_script_path)],
-    )
+    # Attach to warm daemon sessions when a daemon for this server is running
+    session_factory = None
+    socket_path = socket_path or get_socket_path()
+    if use_daemon and await daemon.daemon_serves(socket_path, server_parameters):
+        logging.info(f"Attaching to agent daemon at {socket_path}")
+        session_factory = lambda: daemon.connect(socket_path, server_parameters)
     
-    # Define a system prompt for the agent
-    system_prompt = """
-    You are an expert AI agent. 
-    You are given a task and you need to complete it using the tools available.
-    You are currently working in the directory: {cwd}
-    """
+    # Timing spans go to the requested files, and to the daemon's metrics
+    sinks = []
+    if trace_file:
+        sinks.append(JsonLinesSink(trace_file))
+    if otel_file:
+        sinks.append(OTLPJsonSink(otel_file))
+    span_buffer = BufferSink() if session_factory is not None else None
+    if span_buffer is not None:
+        sinks.append(span_buffer)
+    tracer = Tracer(sinks)
     
-    # Add current working directory to the system prompt
-    cwd = os.getcwd()
-    system_prompt = system_prompt.format(cwd=cwd)
+    system_prompt = build_system_prompt()
+    tool_cache = get_tool_cache() if cache_tools else None
     
     # Create the agent with OpenAI integration and logging support
     agent = SimpleAgent.create_with_openai(
         logs_dir=str(logs_dir),
+        log_format=log_format,
         server_parameters=server_parameters,
         system_prompt=system_prompt,
         model="gpt-4o-mini",
         temperature=0.7,
         max_tokens=2048,
-        api_key=api_key,
+        api_key=get_api_key(),
         max_steps=5,
         verbosity_level=logging.INFO,
+        session_factory=session_factory,
+        tool_timeout=tool_timeout,
+        tool_cache=tool_cache,
+        response_cache=response_cache,
+        scheduler=scheduler,
+        context_budget=ContextBudget(context_tokens) if context_tokens else None,
+        observation_store=ObservationStore(spill_threshold) if spill_threshold else None,
+        tracer=tracer,
+        manifest_cache=get_manifest_cache(),
     )
     
     # Run the agent
-    result = await agent.run(query)
+    try:
+        result = await agent.run(query, resume=resume)
+    finally:
+        tracer.close()
+        if span_buffer is not None and span_buffer.records:
+            await daemon.report_spans(socket_path, span_buffer.records)
+    if tool_cache is not None:
+        tool_cache.save()
     
     return result
 
+async def run_daemon(server_script_path: str = None, socket_path: str = None, max_sessions: int = 4,
+                     metrics_port: int = None):
+    """Run the agent daemon in the foreground until interrupted.
+    
+    Args:
+        server_script_path: Optional path to the server script
+        socket_path: Optional path to the daemon socket
+        max_sessions: Maximum number of warm server sessions to keep
+        metrics_port: Optional local port to serve Prometheus metrics on
+    """
+    import daemon
+    
+    agent_daemon = daemon.AgentDaemon(
+        server_parameters=get_server_parameters(server_script_path),
+        socket_path=socket_path or get_socket_path(),
+        max_sessions=max_sessions,
+        metrics_port=metrics_port,
+    )
+    await agent_daemon.serve_forever()
+
 def main():
     """Main entry point for the CLI."""
+    # `agent batch ...` runs many tasks concurrently; see batch.py
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        import batch
+        batch.main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
-        description="AI Agent CLI - Run AI agent queries from anywhere"
+        description="AI Agent CLI - Run AI agent queries from anywhere",
+        epilog="Use 'agent batch tasks.jsonl' to run many tasks concurrently."
     )
     parser.add_argument(
         "query", 
@@ -168,11 +450,123 @@ def main():
         dest="server_path",
         help="Path to the server.py script (defaults to the one in the same directory as this script)"
     )
+    parser.add_argument(
+        "--add-server",
+        dest="extra_servers",
+        action="append",
+        metavar="[NAME=]PATH",
+        help="Also connect to this MCP server script; repeat for more. Tools whose "
+             "names collide are offered as NAME.tool"
+    )
     parser.add_argument(
         "--logs-dir", "-l",
         dest="logs_dir",
         help="Directory to store logs (defaults to platform-specific location)"
     )
+    parser.add_argument(
+        "--log-format",
+        choices=["jsonl", "compact"],
+        default="jsonl",
+        help="Log format: plain JSON lines, or compact (compressed, with system prompts and "
+             "large observations stored once per logs directory) (default: jsonl)"
+    )
+    parser.add_argument(
+        "--persistent-shell",
+        action="store_true",
+        help="Run terminal commands in one shell for the whole run, so cd and exports carry over"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="LOGFILE",
+        help="Continue an interrupted run from its log file instead of starting a new one"
+    )
+    parser.add_argument(
+        "--tool-timeout",
+        type=float,
+        help="Timeout in seconds for each tool call (default: no timeout)"
+    )
+    parser.add_argument(
+        "--context-tokens",
+        type=int,
+        default=100000,
+        help="Token budget for the context sent to the model; older observations "
+             "are shortened to fit (default: 100000, 0 to disable)"
+    )
+    parser.add_argument(
+        "--spill-threshold",
+        type=int,
+        default=20000,
+        help="Show observations longer than this many characters as a preview the "
+             "agent can page through (default: 20000, 0 to disable)"
+    )
+    parser.add_argument(
+        "--cache-tools",
+        action="store_true",
+        help="Reuse results of repeated cacheable tool calls (e.g. weather, read-only commands)"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=500,
+        help="Model requests per minute allowed by your API plan (default: 500, 0 for no limit)"
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=200000,
+        help="Model tokens per minute allowed by your API plan (default: 200000, 0 for no limit)"
+    )
+    parser.add_argument(
+        "--llm-cache",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Record model responses and reuse them for identical requests "
+             "(optionally in DIR instead of the app data directory)"
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Only replay recorded model responses; fail on a cache miss (implies --llm-cache)"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a daemon that keeps MCP server sessions warm for later calls"
+    )
+    parser.add_argument(
+        "--daemon-sessions",
+        type=int,
+        default=4,
+        help="Maximum number of warm server sessions the daemon keeps (default: 4)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="With --daemon, serve Prometheus metrics on http://127.0.0.1:PORT/metrics"
+    )
+    parser.add_argument(
+        "--trace",
+        dest="trace_file",
+        metavar="FILE",
+        help="Append timing spans of each step (model call, tool calls, ...) to FILE as JSON lines"
+    )
+    parser.add_argument(
+        "--otel",
+        dest="otel_file",
+        metavar="FILE",
+        help="Append timing spans to FILE in the OpenTelemetry OTLP/JSON format"
+    )
+    parser.add_argument(
+        "--socket",
+        dest="socket_path",
+        help="Path to the daemon socket (defaults to one in the app data directory)"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Always spawn a fresh server instead of attaching to a running daemon"
+    )
     parser.add_argument(
         "--verbose", "-v", 
         action="store_true",
@@ -185,21 +579,49 @@ def main():
     log_level = logging.INFO if args.verbose else logging.WARNING
     logging.basicConfig(level=log_level, format="%(levelname)s: %(message)s")
     
-    # Check if API key is available
-    if not api_key:
+    # Daemon mode only manages MCP sessions, so it needs no API key
+    if args.daemon:
+        import daemon
+        try:
+            asyncio.run(run_daemon(
+                args.server_path, args.socket_path, args.daemon_sessions, args.metrics_port
+            ))
+        except KeyboardInterrupt:
+            pass
+        except (FileNotFoundError, daemon.DaemonError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+    
+    # Check if API key is available (replayed runs never call the API)
+    if not get_api_key() and not args.replay:
         print("Error: OPENAI_API_KEY environment variable not set.")
         print("Please set it in your environment or in a .env file.")
         sys.exit(1)
     
     # If no query is provided, prompt the user
-    if not args.query:
+    if not args.query and not args.resume:
         args.query = input("Enter your query: ")
     
+    response_cache = None
+    if args.llm_cache is not None or args.replay:
+        response_cache = get_response_cache(args.llm_cache, replay=args.replay)
+    
     try:
-        result = asyncio.run(run_agent(args.query, args.server_path, args.logs_dir))
+        result = asyncio.run(run_agent(
+            args.query, args.server_path, args.logs_dir,
+            socket_path=args.socket_path, use_daemon=not args.no_daemon,
+            tool_timeout=args.tool_timeout, cache_tools=args.cache_tools,
+            response_cache=response_cache, context_tokens=args.context_tokens,
+            spill_threshold=args.spill_threshold, resume=args.resume,
+            trace_file=args.trace_file, otel_file=args.otel_file,
+            extra_servers=args.extra_servers,
+            scheduler=RequestScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm),
+            log_format=args.log_format, persistent_shell=args.persistent_shell,
+        ))
         print("\033[94mAgent Result:\033[0m")
         print(result)
-    except FileNotFoundError as e:
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         sys.exit(1)
     except Exception as e:
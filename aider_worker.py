@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Aider worker - one persistent Aider session, driven over stdin/stdout.
+
+`run_aider` in server.py starts a worker per repository and file set, with
+the files as arguments, and sends it successive messages. The Aider coder is
+created once, so its repo map, git state and model setup are reused across
+messages instead of being rebuilt by a fresh `aider --message` process.
+
+The protocol is newline-delimited JSON. The worker sends `{"ready": true}`
+once Aider is set up, or `{"error": "..."}` if it can't be, with
+`"unavailable": true` if this Python can't import aider. Each request
+`{"message": "..."}` is answered with `{"output": "..."}` frames while Aider
+prints, then `{"done": true}`.
+"""
+
+import io
+import json
+import os
+import sys
+
+# Aider flags for unattended use; other settings come from its usual config
+# files and environment variables, as with the aider command
+AIDER_ARGS = ["--yes-always", "--no-pretty", "--no-fancy-input", "--no-check-update"]
+
+class ForwardOutput(io.TextIOBase):
+    """A stdout replacement that forwards everything written as output frames."""
+
+    def __init__(self, send):
+        self.send = send
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.send(output=text)
+        return len(text)
+
+def main():
+    # Keep the real stdout for the protocol, and send anything else that
+    # writes to file descriptor 1 (e.g. git) to stderr
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    def send(**frame):
+        protocol.write(json.dumps(frame) + "\n")
+        protocol.flush()
+
+    sys.stdout = ForwardOutput(send)
+    try:
+        from aider.main import main as aider_main
+    except ImportError as e:
+        send(error=f"Aider can't be imported by {sys.executable}: {e}", unavailable=True)
+        return
+    try:
+        coder = aider_main(argv=AIDER_ARGS + sys.argv[1:], return_coder=True)
+    except (Exception, SystemExit) as e:
+        send(error=f"Failed to start Aider: {e}")
+        return
+    if coder is None or isinstance(coder, int):
+        send(error="Failed to start Aider")
+        return
+    send(ready=True)
+
+    for line in sys.stdin:
+        try:
+            message = json.loads(line)["message"]
+        except (ValueError, KeyError, TypeError):
+            send(output="Error: invalid request\n")
+            send(done=True)
+            continue
+        try:
+            coder.run(with_message=message)
+        except Exception as e:
+            send(output=f"Error: {e}\n")
+        send(done=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Batch runner - run many agent tasks concurrently over a pool of MCP servers.
+
+Tasks are read from a JSONL file (or stdin), one per line, either as a JSON
+string or as an object with a "task" (or "query") field and an optional "id":
+
+    {"id": "weather-nyc", "task": "What's the weather in New York?"}
+
+Each task gets its own agent, so message histories never mix, while server
+processes are reused across tasks. Results are written as JSON lines as soon
+as each task finishes, and a throughput/latency summary is printed at the end.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from mcp import StdioServerParameters
+
+from agent import MCPSimpleAgent, ModelFunction, ASSISTANT, create_openai_model
+from context_budget import ContextBudget
+from observations import ObservationStore
+from sessions import SessionPool
+from tool_cache import ToolResultCache
+from scheduler import RequestScheduler
+from tool_manifest import ManifestCache
+import agent_cli
+
+logger = logging.getLogger("mcp_simple_agent")
+
+def read_tasks(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """Parse JSONL task lines into (id, task) pairs.
+
+    Args:
+        lines: Lines of a JSONL task file
+
+    Returns:
+        list: (task id, task text) pairs in input order
+    """
+    tasks = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        entry = json.loads(line)
+        if isinstance(entry, str):
+            task_id, task = str(line_number), entry
+        else:
+            task_id = str(entry.get("id", line_number))
+            task = entry.get("task") or entry.get("query")
+            if not task:
+                raise ValueError(f"Line {line_number}: task entry has no 'task' field")
+        tasks.append((task_id, task))
+    return tasks
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+@dataclass
+class BatchStats:
+    """Aggregate results of a batch run."""
+    succeeded: int = 0
+    failed: int = 0
+    latencies: List[float] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.succeeded + self.failed
+        return {
+            "tasks": total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "wall_time": round(self.wall_time, 3),
+            "throughput": round(total / self.wall_time, 3) if self.wall_time else 0.0,
+            "latency_p50": round(percentile(self.latencies, 50), 3),
+            "latency_p90": round(percentile(self.latencies, 90), 3),
+            "latency_p99": round(percentile(self.latencies, 99), 3),
+            "latency_max": round(max(self.latencies, default=0.0), 3),
+        }
+
+async def run_batch(
+    tasks: List[Tuple[str, str]],
+    model: ModelFunction,
+    server_parameters: StdioServerParameters,
+    parallelism: int = 4,
+    system_prompt: Optional[str] = None,
+    max_steps: int = 5,
+    tool_timeout: Optional[float] = None,
+    tool_cache: Optional[ToolResultCache] = None,
+    manifest_cache: Optional[ManifestCache] = None,
+    context_tokens: int = 100000,
+    spill_threshold: int = 20000,
+    logs_dir: Optional[str] = None,
+    log_format: str = "jsonl",
+    output: TextIO = sys.stdout,
+) -> BatchStats:
+    """Run tasks concurrently, streaming one JSON result line per finished task.
+
+    Args:
+        tasks: (task id, task text) pairs
+        model: Model function shared by all agents
+        server_parameters: Parameters of the MCP server to pool
+        parallelism: Number of tasks (and server processes) to run at once
+        system_prompt: System prompt for every agent
+        max_steps: Maximum steps per task
+        tool_timeout: Optional timeout in seconds for each tool call
+        tool_cache: Optional tool result cache shared by all tasks
+        manifest_cache: Optional tool manifest cache shared by all tasks
+        context_tokens: Token budget for each agent's context (0 to disable)
+        spill_threshold: Observation size above which it is spilled to disk (0 to disable)
+        logs_dir: Optional directory to save each task's messages
+        log_format: "jsonl", or "compact" for deduplicated, compressed logs
+        output: Stream to write result lines to
+
+    Returns:
+        BatchStats: Counts and latencies of the run
+    """
+    stats = BatchStats()
+    if not tasks:
+        return stats
+    batch_name = time.strftime("%Y%m%d_%H%M%S")
+    if logs_dir:
+        os.makedirs(logs_dir, exist_ok=True)
+    slots = asyncio.Semaphore(parallelism)
+
+    async def run_one(pool: SessionPool, task_id: str, task: str):
+        async with slots:
+            await run_task(pool, task_id, task)
+
+    async def run_task(pool: SessionPool, task_id: str, task: str):
+        agent = MCPSimpleAgent(
+            server_parameters=server_parameters,
+            model=model,
+            system_prompt=system_prompt,
+            max_steps=max_steps,
+            verbosity_level=logger.level,
+            session_factory=pool.acquire,
+            tool_timeout=tool_timeout,
+            tool_cache=tool_cache,
+            manifest_cache=manifest_cache,
+            context_budget=ContextBudget(context_tokens) if context_tokens else None,
+            observation_store=ObservationStore(spill_threshold) if spill_threshold else None,
+        )
+        record = {"id": task_id}
+        start = time.perf_counter()
+        try:
+            record["result"] = await agent.run(task)
+            stats.succeeded += 1
+        except Exception as e:
+            record["error"] = str(e)
+            stats.failed += 1
+        latency = time.perf_counter() - start
+        stats.latencies.append(latency)
+        record["steps"] = sum(1 for m in agent.messages if m["role"] == ASSISTANT)
+        record["latency"] = round(latency, 3)
+        if logs_dir:
+            record["log"] = agent_cli.save_logs(
+                agent, logs_dir, name=f"batch_{batch_name}_{task_id}", log_format=log_format
+            )
+        if agent.observation_store is not None:
+            agent.observation_store.close()
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    start = time.perf_counter()
+    async with SessionPool(server_parameters, size=max(1, min(parallelism, len(tasks)))) as pool:
+        await asyncio.gather(*(run_one(pool, task_id, task) for task_id, task in tasks))
+    stats.wall_time = time.perf_counter() - start
+    return stats
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point for `agent batch`."""
+    parser = argparse.ArgumentParser(
+        prog="agent batch",
+        description="Run agent tasks from a JSONL file concurrently"
+    )
+    parser.add_argument(
+        "tasks_file",
+        nargs="?",
+        default="-",
+        help="JSONL file with one task per line (defaults to stdin)"
+    )
+    parser.add_argument(
+        "--parallel", "-p",
+        type=int,
+        default=4,
+        help="Number of tasks and server processes to run at once (default: 4)"
+    )
+    parser.add_argument(
+        "--server", "-s",
+        dest="server_path",
+        help="Path to the server.py script (defaults to the one in the same directory as this script)"
+    )
+    parser.add_argument(
+        "--logs-dir", "-l",
+        dest="logs_dir",
+        help="Directory to store logs (defaults to platform-specific location)"
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=["jsonl", "compact"],
+        default="jsonl",
+        help="Log format: plain JSON lines, or compact (compressed and deduplicated) (default: jsonl)"
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=5,
+        help="Maximum steps per task (default: 5)"
+    )
+    parser.add_argument(
+        "--tool-timeout",
+        type=float,
+        help="Timeout in seconds for each tool call (default: no timeout)"
+    )
+    parser.add_argument(
+        "--context-tokens",
+        type=int,
+        default=100000,
+        help="Token budget for each task's context (default: 100000, 0 to disable)"
+    )
+    parser.add_argument(
+        "--spill-threshold",
+        type=int,
+        default=20000,
+        help="Observation size in characters above which it is spilled to disk (default: 20000, 0 to disable)"
+    )
+    parser.add_argument(
+        "--cache-tools",
+        action="store_true",
+        help="Share results of repeated cacheable tool calls across tasks"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=500,
+        help="Model requests per minute allowed by your API plan (default: 500, 0 for no limit)"
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=200000,
+        help="Model tokens per minute allowed by your API plan (default: 200000, 0 for no limit)"
+    )
+    parser.add_argument(
+        "--llm-cache",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Record model responses and reuse them for identical requests "
+             "(optionally in DIR instead of the app data directory)"
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Only replay recorded model responses; fail on a cache miss (implies --llm-cache)"
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Enable verbose logging"
+    )
+    args = parser.parse_args(argv)
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format="%(levelname)s: %(message)s")
+    logger.setLevel(log_level)
+
+    api_key = agent_cli.get_api_key()
+    if not api_key and not args.replay:
+        print("Error: OPENAI_API_KEY environment variable not set.")
+        print("Please set it in your environment or in a .env file.")
+        sys.exit(1)
+
+    try:
+        if args.tasks_file == "-":
+            tasks = read_tasks(sys.stdin)
+        else:
+            with open(args.tasks_file) as f:
+                tasks = read_tasks(f)
+        server_parameters = agent_cli.get_server_parameters(args.server_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    logs_dir = args.logs_dir or agent_cli.get_logs_directory()
+    tool_cache = agent_cli.get_tool_cache() if args.cache_tools else None
+    manifest_cache = agent_cli.get_manifest_cache()
+    response_cache = None
+    if args.llm_cache is not None or args.replay:
+        response_cache = agent_cli.get_response_cache(args.llm_cache, replay=args.replay)
+    # One scheduler shares the API rate limits between all concurrent tasks
+    scheduler = RequestScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    model = create_openai_model(
+        model="gpt-4o-mini", temperature=0.7, max_tokens=2048, api_key=api_key,
+        response_cache=response_cache, scheduler=scheduler,
+    )
+
+    # Keep stdout for result lines; the agents' progress output goes to stderr
+    results = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        stats = asyncio.run(run_batch(
+            tasks, model, server_parameters,
+            parallelism=args.parallel,
+            system_prompt=agent_cli.build_system_prompt(),
+            max_steps=args.max_steps,
+            tool_timeout=args.tool_timeout,
+            tool_cache=tool_cache,
+            manifest_cache=manifest_cache,
+            context_tokens=args.context_tokens,
+            spill_threshold=args.spill_threshold,
+            logs_dir=logs_dir,
+            log_format=args.log_format,
+            output=results,
+        ))
+
+    summary = stats.summary()
+    if tool_cache is not None:
+        tool_cache.save()
+        summary["tool_cache"] = tool_cache.stats()
+    summary["manifest_cache"] = manifest_cache.stats()
+    summary["scheduler"] = scheduler.stats()
+    if response_cache is not None:
+        summary["llm_cache"] = response_cache.stats()
+    print(json.dumps({"summary": summary}), file=sys.stderr)
+    if stats.failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks of the agent loop's own overhead.
+
+Runs MCPSimpleAgent against the mock MCP server in this directory with a
+scripted, instant model, so the numbers leave out OpenAI and network latency
+and reflect only the framework: session startup, per-step overhead, memory
+growth over long runs, throughput of concurrent runs, the cost of
+building the prompt and logging, and how the per-step cost of memory
+changes as a run grows to --history-steps steps. Results are printed as JSON; with
+--baseline, metrics that got slower than a previous result are reported and
+the exit status is 1.
+
+    python benchmarks/bench_agent.py --output results.json
+    python benchmarks/bench_agent.py --baseline results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcp import StdioServerParameters
+
+from agent import ASSISTANT, USER, MCPSimpleAgent
+from agent_cli import save_logs
+from batch import run_batch
+from context_budget import ContextBudget
+from fake_model import ScriptedModel
+from journal import StepJournal
+from observations import ObservationStore
+from scheduler import estimate_tokens, trajectory_priority
+
+logger = logging.getLogger("mcp_simple_agent")
+
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_server.py")
+
+# Metrics where lower is better, compared against --baseline
+TRACKED_METRICS = [
+    ("startup", "median"),
+    ("step_overhead", "per_step"),
+    ("memory", "growth_per_step"),
+    ("prompt", "per_call"),
+    ("history", "last_per_step"),
+    ("logging", "journal_per_message"),
+    ("logging", "save_logs"),
+]
+
+def server_parameters(latency: float, payload: int) -> StdioServerParameters:
+    return StdioServerParameters(
+        command=sys.executable,
+        args=[MOCK_SERVER],
+        env={"MOCK_TOOL_LATENCY": str(latency), "MOCK_PAYLOAD_BYTES": str(payload)},
+    )
+
+def make_agent(args, model: ScriptedModel, max_steps: int) -> MCPSimpleAgent:
+    return MCPSimpleAgent(
+        server_parameters=server_parameters(args.latency, args.payload),
+        model=model,
+        max_steps=max_steps,
+        verbosity_level=logging.WARNING,
+        context_budget=ContextBudget(args.context_tokens) if args.context_tokens else None,
+        observation_store=ObservationStore(args.spill_threshold) if args.spill_threshold else None,
+    )
+
+async def timed_run(args, tool_steps: int) -> float:
+    """Wall time of one run that makes `tool_steps` tool calls, then answers."""
+    agent = make_agent(args, ScriptedModel(tool_steps), max_steps=tool_steps + 1)
+    start = time.perf_counter()
+    await agent.run("benchmark")
+    elapsed = time.perf_counter() - start
+    if agent.observation_store is not None:
+        agent.observation_store.close()
+    return elapsed
+
+async def bench_startup(args) -> Dict[str, Any]:
+    """Spawn the server, initialize, list tools and answer without tool calls."""
+    times = [await timed_run(args, 0) for _ in range(args.repeat)]
+    return {"median": statistics.median(times), "min": min(times), "runs": len(times)}
+
+async def bench_step_overhead(args, startup: float) -> Dict[str, Any]:
+    """Time per tool step beyond the mock tool's own latency."""
+    times = [await timed_run(args, args.steps) for _ in range(args.repeat)]
+    run_time = statistics.median(times)
+    per_step = (run_time - startup) / args.steps - args.latency
+    return {"run_time": run_time, "steps": args.steps, "per_step": max(0.0, per_step)}
+
+async def bench_memory(args) -> Dict[str, Any]:
+    """Traced Python memory sampled at every model call over a long run."""
+    samples: List[int] = []
+    model = ScriptedModel(args.long_steps, on_call=lambda messages: samples.append(tracemalloc.get_traced_memory()[0]))
+    agent = make_agent(args, model, max_steps=args.long_steps + 1)
+    tracemalloc.start()
+    try:
+        await agent.run("benchmark")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    if agent.observation_store is not None:
+        agent.observation_store.close()
+    # Skip the first step, which includes one-off session setup
+    growth = (samples[-1] - samples[1]) / (len(samples) - 2) if len(samples) > 2 else 0.0
+    return {
+        "steps": args.long_steps,
+        "start_bytes": samples[0] if samples else 0,
+        "end_bytes": samples[-1] if samples else 0,
+        "peak_bytes": peak,
+        "growth_per_step": growth,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+async def bench_throughput(args) -> Dict[str, Any]:
+    """Concurrent runs over a pool of mock servers, as in batch mode."""
+    tasks = [(str(i), "benchmark") for i in range(args.tasks)]
+    stats = await run_batch(
+        tasks, ScriptedModel(args.steps), server_parameters(args.latency, args.payload),
+        parallelism=args.concurrency,
+        max_steps=args.steps + 1,
+        context_tokens=args.context_tokens,
+        spill_threshold=args.spill_threshold,
+        output=io.StringIO(),
+    )
+    return {"concurrency": args.concurrency, **stats.summary()}
+
+def agent_with_history(args, steps: int) -> MCPSimpleAgent:
+    """An agent whose memory looks like that of a run with `steps` tool steps."""
+    agent = make_agent(args, ScriptedModel(steps), max_steps=steps)
+    agent.add_message(USER, "benchmark")
+    observation = "x" * args.payload
+    for step in range(steps):
+        agent.add_message(ASSISTANT, json.dumps({"name": "mock_tool", "arguments": {"query": f"step {step}"}}))
+        agent.add_message(USER, observation)
+    return agent
+
+def bench_prompt(args) -> Dict[str, Any]:
+    """Cost of get_openai_messages on a long history, one new step per call."""
+    agent = agent_with_history(args, args.long_steps)
+    observation = "x" * args.payload
+    start = time.perf_counter()
+    for step in range(args.repeat * 20):
+        agent.add_message(ASSISTANT, "{}")
+        agent.add_message(USER, observation)
+        agent.get_openai_messages()
+    calls = args.repeat * 20
+    return {"messages": len(agent.messages), "per_call": (time.perf_counter() - start) / calls}
+
+def bench_history(args) -> Dict[str, Any]:
+    """Per-step memory cost (add a step, build the prompt) early and late in a long run.
+
+    A step also does what the model call does with the prompt before sending
+    it: the scheduler's token estimate and priority. A flat cost means a step
+    costs the same at step 1,000 as at step 10.
+    """
+    agent = make_agent(args, ScriptedModel(args.history_steps), max_steps=args.history_steps)
+    agent.add_message(USER, "benchmark")
+    observation = "x" * args.payload
+    times = []
+    for step in range(args.history_steps):
+        start = time.perf_counter()
+        agent.add_message(ASSISTANT, json.dumps({"name": "mock_tool", "arguments": {"query": f"step {step}"}}))
+        agent.add_message(USER, observation)
+        messages = agent.get_openai_messages()
+        estimate_tokens(messages)
+        trajectory_priority(messages)
+        times.append(time.perf_counter() - start)
+    window = max(1, len(times) // 10)
+    first, last = statistics.median(times[:window]), statistics.median(times[-window:])
+    return {
+        "steps": args.history_steps,
+        "first_per_step": first,
+        "last_per_step": last,
+        "growth": last / first if first else 0.0,
+    }
+
+def bench_logging(args) -> Dict[str, Any]:
+    """Cost of journaling messages and of saving a long run's log."""
+    agent = agent_with_history(args, args.long_steps)
+    with tempfile.TemporaryDirectory() as logs_dir:
+        journal = StepJournal(os.path.join(logs_dir, "journal.jsonl")).open()
+        start = time.perf_counter()
+        for message in agent.messages:
+            journal.append(message)
+        append_time = time.perf_counter() - start
+        journal.close()
+        flushed_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_logs(agent, logs_dir, name="benchmark")
+        save_time = time.perf_counter() - start
+    return {
+        "messages": len(agent.messages),
+        "journal_per_message": append_time / len(agent.messages),
+        "journal_flushed": flushed_time,
+        "save_logs": save_time,
+    }
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    results["startup"] = await bench_startup(args)
+    results["step_overhead"] = await bench_step_overhead(args, results["startup"]["median"])
+    results["memory"] = await bench_memory(args)
+    results["throughput"] = await bench_throughput(args)
+    results["prompt"] = bench_prompt(args)
+    results["history"] = bench_history(args)
+    results["logging"] = bench_logging(args)
+    return results
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Tracked metrics more than `tolerance` (a fraction) worse than the baseline."""
+    regressions = []
+    for section, metric in TRACKED_METRICS:
+        old = baseline.get("results", {}).get(section, {}).get(metric)
+        new = results.get(section, {}).get(metric)
+        if old is None or new is None:
+            continue
+        if new > old * (1 + tolerance) and new - old > 1e-6:
+            regressions.append(f"{section}.{metric}: {old:.6g} -> {new:.6g}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agent loop offline")
+    parser.add_argument("--steps", type=int, default=10, help="Tool steps per run (default: 10)")
+    parser.add_argument("--long-steps", type=int, default=200,
+                        help="Tool steps of the long run used for memory, prompt and logging (default: 200)")
+    parser.add_argument("--history-steps", type=int, default=1000,
+                        help="Tool steps of the run used for the per-step history cost (default: 1000)")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="Fail if the per-step history cost grows more than this from early to late steps "
+                             "(default: 3.0, 0 to disable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions of timed runs (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock tool latency in seconds (default: 0)")
+    parser.add_argument("--payload", type=int, default=1000, help="Mock observation size in bytes (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent runs for throughput (default: 4)")
+    parser.add_argument("--tasks", type=int, default=20, help="Runs for throughput (default: 20)")
+    parser.add_argument("--context-tokens", type=int, default=100000,
+                        help="Context budget, as in the CLI (default: 100000, 0 to disable)")
+    parser.add_argument("--spill-threshold", type=int, default=20000,
+                        help="Observation spill threshold, as in the CLI (default: 20000, 0 to disable)")
+    parser.add_argument("--output", "-o", help="Also write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous results file")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown against the baseline, as a fraction (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+    logger.setLevel(logging.WARNING)
+
+    # The agent prints its progress; keep stdout for the results
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = asyncio.run(run_benchmarks(args))
+
+    report = {
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "tolerance", "max_growth")},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    regressions = []
+    growth = results["history"]["growth"]
+    if args.max_growth and growth > args.max_growth:
+        regressions.append(f"history.growth: {growth:.3g} is over the limit of {args.max_growth:g}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions += compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
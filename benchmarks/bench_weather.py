@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the weather tools against a local stand-in for wttr.in.
+
+Starts a small HTTP server on localhost that answers like wttr.in's
+`?format=4` after a configurable delay, points server.py at it with
+AGENT_WEATHER_URL, and times lookups with a new client per request (as
+fetch_weather used to), with the pooled client, batched, and from the
+response cache. Results are printed as JSON.
+
+    python benchmarks/bench_weather.py --cities 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def start_stand_in(latency: float) -> ThreadingHTTPServer:
+    """Serve wttr.in-like responses on a free local port, in a thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            city = unquote(urlsplit(self.path).path.lstrip("/"))
+            body = f"{city}: ☀️   🌡️+21°C 🌬️↗11km/h\n".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+async def timed(coroutine) -> float:
+    start = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - start
+
+async def run_benchmarks(args, base_url: str) -> Dict[str, Any]:
+    import httpx
+    import server
+
+    cities: List[str] = [f"City{i}" for i in range(args.cities)]
+
+    async def fresh_clients():
+        for city in cities:
+            async with httpx.AsyncClient() as client:
+                (await client.get(f"{base_url}/{city}", params={"format": "4"})).raise_for_status()
+
+    async def pooled():
+        for city in cities:
+            await server.fetch_weather(city)
+
+    results: Dict[str, Any] = {}
+    server.weather_cache.clear()
+    server.WEATHER_CACHE_TTL = 0
+    async with server.lifespan(server.mcp):
+        results["fresh_client"] = {"total": await timed(fresh_clients())}
+        results["pooled"] = {"total": await timed(pooled())}
+        results["batch"] = {
+            "total": await timed(server.fetch_weather_batch(cities)),
+            "concurrency": server.WEATHER_CONCURRENCY,
+        }
+        server.WEATHER_CACHE_TTL = 60
+        await server.fetch_weather_batch(cities)
+        results["cached"] = {"total": await timed(pooled())}
+    for result in results.values():
+        result["per_city"] = result["total"] / len(cities)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the weather tools against a local stand-in")
+    parser.add_argument("--cities", type=int, default=50, help="Cities to look up (default: 50)")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Stand-in server delay per request in seconds (default: 0.02)")
+    parser.add_argument("--output", "-o", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    httpd = start_stand_in(args.latency)
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    # server.py reads its settings at import
+    os.environ["AGENT_WEATHER_URL"] = base_url
+    try:
+        results = asyncio.run(run_benchmarks(args, base_url))
+    finally:
+        httpd.shutdown()
+
+    text = json.dumps({"config": vars(args), "results": results}, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
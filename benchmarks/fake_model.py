@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Scripted model for benchmarks.
+
+A stand-in for the OpenAI model function that answers instantly: it calls
+`mock_tool` until the conversation has a given number of tool steps, then
+gives a final answer. It decides from the messages alone, so one instance can
+be shared by concurrent agents.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+class ScriptedModel:
+    """Call `mock_tool` for a number of steps, then answer.
+
+    Args:
+        tool_steps: Number of tool calls before the final answer
+        on_call: Optional hook called with the messages on every call, e.g.
+                 to sample memory use
+    """
+
+    def __init__(self, tool_steps: int, on_call: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.tool_steps = tool_steps
+        self.on_call = on_call
+        self.calls = 0
+
+    async def __call__(self, messages: List[Dict[str, Any]]) -> str:
+        self.calls += 1
+        if self.on_call is not None:
+            self.on_call(messages)
+        step = sum(1 for m in messages if m["role"] == "assistant")
+        if step >= self.tool_steps:
+            return json.dumps({"name": "final_answer", "arguments": {"answer": f"done after {step} steps"}})
+        return json.dumps({"name": "mock_tool", "arguments": {"query": f"step {step + 1}"}})
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the CLI's cold start.
+
+Imports `agent_cli` in fresh interpreters under `python -X importtime`, and
+fails if the median cumulative import time exceeds a budget, or if any of the
+heavy dependencies that should only load when needed (mcp, openai, ...) is
+imported. The slowest imports are reported to help find the culprit.
+
+    python benchmarks/importtime.py --budget-ms 150
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported only when a run actually needs them
+LAZY_MODULES = ["mcp", "openai", "dotenv", "anyio", "httpx", "tiktoken", "jsonschema"]
+
+def measure(module: str) -> Tuple[int, Dict[str, int]]:
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        tuple: Cumulative import time of the module in microseconds, and the
+               cumulative time of every module imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times[module], times
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Check the CLI's import time against a budget")
+    parser.add_argument("--budget-ms", type=float, default=150, help="Import time budget in ms (default: 150)")
+    parser.add_argument("--module", default="agent_cli", help="Module to import (default: agent_cli)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to measure (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to report (default: 10)")
+    args = parser.parse_args(argv)
+
+    samples = []
+    for _ in range(args.repeat):
+        total, times = measure(args.module)
+        samples.append(total)
+    median_ms = statistics.median(samples) / 1000
+    lazy_loaded = sorted(
+        name for name in times if name.split(".")[0] in LAZY_MODULES and "." not in name
+    )
+    slowest = sorted(
+        ((name, us) for name, us in times.items() if name != args.module),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+
+    report = {
+        "module": args.module,
+        "import_ms": round(median_ms, 1),
+        "budget_ms": args.budget_ms,
+        "samples_ms": [round(us / 1000, 1) for us in samples],
+        "lazy_modules_imported": lazy_loaded,
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in slowest],
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import of {args.module} took {median_ms:.1f} ms, over the {args.budget_ms:g} ms budget")
+    if lazy_loaded:
+        failures.append(f"{args.module} imports {', '.join(lazy_loaded)} at import time")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Mock MCP server for benchmarks.
+
+Serves a single `mock_tool` over stdio that sleeps for a fixed latency and
+returns a payload of a fixed size, so the agent loop can be measured without
+real tools, network or shell commands. Both are set through the environment:
+
+    MOCK_TOOL_LATENCY: Seconds each call takes (default: 0)
+    MOCK_PAYLOAD_BYTES: Size of each observation in bytes (default: 1000)
+"""
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("MockServer", log_level="WARNING")
+
+TOOL_LATENCY = float(os.environ.get("MOCK_TOOL_LATENCY", "0"))
+PAYLOAD_BYTES = int(os.environ.get("MOCK_PAYLOAD_BYTES", "1000"))
+
+@mcp.tool()
+async def mock_tool(query: str) -> str:
+    """
+    Return a fixed-size payload after a fixed delay.
+    Args:
+        query: Any text, echoed at the start of the payload
+    Returns:
+        str: The payload
+    """
+    if TOOL_LATENCY:
+        await asyncio.sleep(TOOL_LATENCY)
+    payload = f"{query}: "
+    return payload + "x" * max(0, PAYLOAD_BYTES - len(payload))
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
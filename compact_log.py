@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Compact logs - deduplicated, compressed storage for run logs.
+
+A plain `.jsonl` log repeats the full system prompt in every run, and often
+the same large observations too. A compact log (`.tlog`) is gzip-compressed
+JSON lines in which any content of BLOB_THRESHOLD bytes or more is replaced
+by a reference to a content-addressed blob. Blobs are stored once per logs
+directory, zlib-compressed, in `blobs/` under their SHA-256, so every run
+with the same system prompt shares one copy.
+
+Both formats are read lazily through `iter_messages`, one record at a time,
+without loading the whole file:
+
+    python compact_log.py convert DIR_OR_FILE... [--remove]
+    python compact_log.py cat FILE [--start N] [--limit N]
+    python compact_log.py gc DIR
+"""
+
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("mcp_simple_agent")
+
+COMPACT_SUFFIX = ".tlog"
+BLOB_DIRNAME = "blobs"
+# Contents shorter than this stay inline; a blob file costs more than it saves
+BLOB_THRESHOLD = 1024
+# gc keeps blobs written or reused this recently (in seconds): a writer may
+# have stored one but not yet renamed the log that refers to it into place
+BLOB_GRACE_PERIOD = 3600
+
+class BlobStore:
+    """Content-addressed, zlib-compressed blobs in a directory.
+
+    Args:
+        root: Directory holding the blobs, created on first write
+        cache_size: Number of recently read blobs kept in memory
+    """
+
+    def __init__(self, root: str, cache_size: int = 64):
+        self.root = root
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def put(self, text: str) -> str:
+        """Store a blob, unless it already is, and return its digest."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            # Reuse refreshes the blob's age, so gc leaves it to the new log
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(data))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Read a blob by digest."""
+        text = self._cache.get(digest)
+        if text is not None:
+            self._cache.move_to_end(digest)
+            return text
+        with open(self.path(digest), "rb") as f:
+            text = zlib.decompress(f.read()).decode("utf-8")
+        self._cache[digest] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def digests(self) -> Iterator[str]:
+        """Digests of all stored blobs."""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.scandir(self.root):
+            if prefix.is_dir() and len(prefix.name) == 2:
+                for entry in os.scandir(prefix.path):
+                    if not entry.name.endswith(".tmp"):
+                        yield prefix.name + entry.name
+
+    def age(self, digest: str) -> float:
+        """Seconds since the blob was last written or reused."""
+        return time.time() - os.path.getmtime(self.path(digest))
+
+    def remove(self, digest: str):
+        os.remove(self.path(digest))
+        self._cache.pop(digest, None)
+
+def blob_store_for(path: str) -> BlobStore:
+    """The blob store shared by the logs in a log file's directory."""
+    return BlobStore(os.path.join(os.path.dirname(os.path.abspath(path)), BLOB_DIRNAME))
+
+def is_compact(path: str) -> bool:
+    return path.endswith(COMPACT_SUFFIX)
+
+class CompactLogWriter:
+    """Write records to a compact log, moving large contents into blobs.
+
+    Args:
+        path: Log file to create
+        blobs: Blob store; defaults to the one in the log's directory
+    """
+
+    def __init__(self, path: str, blobs: Optional[BlobStore] = None):
+        self.path = path
+        self.blobs = blobs or blob_store_for(path)
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        content = record.get("content")
+        if isinstance(content, str) and len(content) >= BLOB_THRESHOLD:
+            record = {k: v for k, v in record.items() if k != "content"}
+            record["blob"] = self.blobs.put(content)
+        self._file.write(json.dumps(record))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "CompactLogWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_compact_log(path: str, records: Iterable[Dict[str, Any]]) -> str:
+    """Write records to a new compact log.
+
+    The log is written to a temporary file and renamed into place, so a
+    reader never sees it half written.
+
+    Returns:
+        str: The log's path
+    """
+    tmp_path = f"{path}.tmp"
+    blobs = blob_store_for(path)
+    with CompactLogWriter(tmp_path, blobs) as writer:
+        for record in records:
+            writer.write(record)
+    os.replace(tmp_path, path)
+    return path
+
+def _iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            # Stop at a torn final record
+            if not line.endswith(b"\n"):
+                break
+            yield json.loads(line)
+
+def _iter_compact(path: str, blobs: Optional[BlobStore]) -> Iterator[Dict[str, Any]]:
+    blobs = blobs or blob_store_for(path)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                digest = record.pop("blob", None)
+                if digest is not None:
+                    try:
+                        record["content"] = blobs.get(digest)
+                    except OSError:
+                        logger.warning(f"Missing blob {digest} for {path}")
+                        record["content"] = f"[missing blob {digest}]"
+                yield record
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            logger.warning(f"Stopped reading truncated log {path}")
+
+def iter_records(path: str, blobs: Optional[BlobStore] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily yield the records of a `.jsonl` or compact log, with contents resolved."""
+    if is_compact(path):
+        return _iter_compact(path, blobs)
+    return _iter_jsonl(path)
+
+def iter_messages(path: str, blobs: Optional[BlobStore] = None) -> Iterator[Dict[str, str]]:
+    """Lazily yield a log's messages as {"role", "content"} dicts."""
+    for record in iter_records(path, blobs):
+        yield {"role": record["role"], "content": record["content"]}
+
+def read_messages(path: str, start: int = 0, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Read a range of a log's messages, decoding nothing past its end."""
+    stop = None if limit is None else start + limit
+    return list(itertools.islice(iter_messages(path), start, stop))
+
+def convert(path: str, remove: bool = False) -> str:
+    """Convert a `.jsonl` log to a compact log next to it.
+
+    Args:
+        path: The `.jsonl` log
+        remove: Whether to delete the `.jsonl` log afterwards
+
+    Returns:
+        str: Path of the compact log
+    """
+    target = os.path.splitext(path)[0] + COMPACT_SUFFIX
+    write_compact_log(target, _iter_jsonl(path))
+    # Keep the original timestamp, which orders runs in the viewer
+    stat = os.stat(path)
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    if remove:
+        os.remove(path)
+    return target
+
+def collect_garbage(logs_dir: str, grace_period: float = BLOB_GRACE_PERIOD) -> int:
+    """Remove blobs no compact log in the directory refers to.
+
+    Blobs written or reused within the grace period are kept, since a log
+    being written may refer to them before it is renamed into place.
+
+    Args:
+        logs_dir: Directory of logs with its blob store
+        grace_period: Minimum age in seconds of a blob to remove
+
+    Returns:
+        int: Number of blobs removed
+    """
+    referenced = set()
+    for entry in os.scandir(logs_dir):
+        if entry.is_file() and is_compact(entry.name):
+            with gzip.open(entry.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if '"blob"' in line:
+                        referenced.add(json.loads(line)["blob"])
+    blobs = BlobStore(os.path.join(logs_dir, BLOB_DIRNAME))
+    removed = 0
+    for digest in list(blobs.digests()):
+        if digest in referenced:
+            continue
+        try:
+            if blobs.age(digest) < grace_period:
+                continue
+            blobs.remove(digest)
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+def main(argv: Optional[List[str]] = None):
+    """Command line interface."""
+    parser = argparse.ArgumentParser(description="Convert and read compact run logs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert .jsonl logs to compact logs")
+    convert_parser.add_argument("paths", nargs="+", help="Log files, or directories of logs")
+    convert_parser.add_argument("--remove", action="store_true", help="Delete the .jsonl logs afterwards")
+
+    cat_parser = subparsers.add_parser("cat", help="Print a range of a log's messages as JSON")
+    cat_parser.add_argument("path")
+    cat_parser.add_argument("--start", type=int, default=0)
+    cat_parser.add_argument("--limit", type=int)
+
+    gc_parser = subparsers.add_parser("gc", help="Remove blobs no longer used by any log")
+    gc_parser.add_argument("logs_dir")
+    gc_parser.add_argument(
+        "--grace-period", type=float, default=BLOB_GRACE_PERIOD,
+        help=f"Keep blobs written or reused within this many seconds (default: {BLOB_GRACE_PERIOD})"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        paths = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                paths += sorted(e.path for e in os.scandir(path) if e.is_file() and e.name.endswith(".jsonl"))
+            else:
+                paths.append(path)
+        before = after = 0
+        for path in paths:
+            size = os.path.getsize(path)
+            target = convert(path, remove=args.remove)
+            before += size
+            after += os.path.getsize(target)
+            print(f"{path} -> {target}")
+        print(f"Converted {len(paths)} logs: {before} -> {after} bytes, plus shared blobs", file=sys.stderr)
+    elif args.command == "cat":
+        print(json.dumps({"messages": read_messages(args.path, args.start, args.limit)}))
+    else:
+        print(json.dumps({"removed": collect_garbage(args.logs_dir, args.grace_period)}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Context budget - keep the prompt sent to the model within a token budget.
+
+Token counts are tracked per message and only recomputed for messages that
+changed, so fitting the history each step costs little. When the history is
+over budget, the oldest observations are shortened to a head/tail excerpt,
+then replaced by a short stub if that is still not enough, and as a last
+resort the oldest stubbed turns (a tool call and its observation) are
+dropped. When the caller says the history was only appended to, earlier
+shortening is kept and only the new messages are fitted. The system
+prompt, the task and the most recent turns are always kept verbatim.
+"""
+
+import importlib.util
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# tiktoken is imported on first use, as it is slow to import
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+logger = logging.getLogger("mcp_simple_agent")
+
+ELIDED_STUB = "[Observation elided to fit the context budget]"
+
+class TokenCounter:
+    """Count tokens with tiktoken if available, else estimate from length."""
+
+    # Rough per-message overhead of the chat format
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, encoding_name: str = "o200k_base"):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        if not TIKTOKEN_AVAILABLE:
+            return
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            logger.warning(f"Falling back to estimated token counts: {e}")
+
+    def count(self, text: str) -> int:
+        if not self._loaded:
+            self._load()
+        if self._encoding is not None:
+            tokens = len(self._encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = len(text) // 4 + 1
+        return tokens + self.MESSAGE_OVERHEAD
+
+class ContextBudget:
+    """Fit a message history into a token budget.
+
+    Args:
+        max_tokens: Token budget for the messages sent to the model
+        keep_recent: Number of most recent messages always kept verbatim
+        excerpt_chars: Characters kept from each end of a shortened observation
+    """
+
+    def __init__(self, max_tokens: int, keep_recent: int = 6, excerpt_chars: int = 500,
+                 counter: Optional[TokenCounter] = None):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.excerpt_chars = excerpt_chars
+        self.counter = counter or TokenCounter()
+        self.last_tokens = 0
+        self.last_saved = 0
+        self.total_saved = 0
+        # Per-position cache of (content, token count), reused while unchanged
+        self._counts: List[tuple] = []
+        self._excerpts: Dict[str, tuple] = {}
+        # The last fitted history, position for position, its token counts and
+        # totals, and where the excerpt and stub passes stopped, for fitting
+        # only what was appended. Positions from 2 up to `dropped` are left
+        # out of the prompt.
+        self.fitted: List[Dict[str, Any]] = []
+        self._fitted_counts: List[int] = []
+        self._original = 0
+        self._total = 0
+        self._excerpt_next = 2
+        self._stub_next = 2
+        self.dropped = 2
+        # Positions shortened by the last call, or None if it started over
+        self.last_changed: Optional[List[int]] = None
+
+    def _token_counts(self, messages: List[Dict[str, Any]]) -> List[int]:
+        counts = []
+        for i, message in enumerate(messages):
+            content = message["content"]
+            if i < len(self._counts) and self._counts[i][0] is content:
+                counts.append(self._counts[i][1])
+                continue
+            del self._counts[i:]
+            tokens = self.counter.count(content)
+            self._counts.append((content, tokens))
+            counts.append(tokens)
+        del self._counts[len(messages):]
+        return counts
+
+    def _excerpt(self, content: str) -> tuple:
+        """Head/tail excerpt of an observation and its token count, memoized."""
+        cached = self._excerpts.get(content)
+        if cached is None:
+            n = self.excerpt_chars
+            if len(content) <= 2 * n:
+                cached = (content, self.counter.count(content))
+            else:
+                elided = self.counter.count(content[n:-n]) - TokenCounter.MESSAGE_OVERHEAD
+                text = f"{content[:n]}\n[... {elided} tokens elided ...]\n{content[-n:]}"
+                cached = (text, self.counter.count(text))
+            self._excerpts[content] = cached
+        return cached
+
+    def fit(self, messages: Sequence[Dict[str, Any]], counts: Optional[Sequence[int]] = None,
+            unchanged: int = 0) -> List[Dict[str, Any]]:
+        """Return the messages to send, shortening old observations if needed.
+
+        The input is not modified. Arguments are as for `update`.
+        """
+        self.update(messages, counts, unchanged)
+        return self.fitted[:2] + self.fitted[self.dropped:]
+
+    def update(self, messages: Sequence[Dict[str, Any]], counts: Optional[Sequence[int]] = None,
+               unchanged: int = 0):
+        """Fit the history, leaving the result in `fitted`.
+
+        `fitted` has one message per position of the history; the prompt is
+        its first two and those from `dropped` on. `last_changed` lists the
+        positions shortened by this call, or is None if it started over, so a
+        caller can update its own copy of the prompt without rescanning it.
+
+        Args:
+            messages: The full history
+            counts: Optional token counts of the messages, counted with
+                    this budget's counter (as the message store caches them)
+            unchanged: Number of leading messages that are the same as in the
+                       previous call, which fitted that many messages. Their
+                       shortening is kept and only the messages after them are
+                       fitted, so a step's cost doesn't grow with the history.
+        """
+        if counts is None:
+            counts = self._token_counts(messages)
+        if not unchanged or unchanged != len(self.fitted) or unchanged > len(messages):
+            # Start over
+            self.fitted, self._fitted_counts = [], []
+            self._original = self._total = 0
+            self._excerpt_next = self._stub_next = self.dropped = 2
+            unchanged = 0
+        self.last_changed = [] if unchanged else None
+        for i in range(unchanged, len(messages)):
+            self.fitted.append(messages[i])
+            self._fitted_counts.append(counts[i])
+            self._original += counts[i]
+            self._total += counts[i]
+
+        if self._total > self.max_tokens:
+            # The system prompt, the task and the recent turns stay verbatim.
+            # Each pass carries on from where it stopped last time: the oldest
+            # observations are shortened first, and stay shortened.
+            end = max(2, len(messages) - self.keep_recent)
+            self._excerpt_next = self._shorten(messages, self._excerpt_next, end, self._excerpt)
+            stub = (ELIDED_STUB, self.counter.count(ELIDED_STUB))
+            self._stub_next = self._shorten(messages, self._stub_next, end, lambda content: stub)
+            self._drop(messages, self._stub_next)
+            if self._total > self.max_tokens:
+                logger.warning(f"Context is {self._total} tokens, over the {self.max_tokens} token budget")
+
+        self.last_tokens = self._total
+        self.last_saved = self._original - self._total
+        self.total_saved += self.last_saved
+        if self.last_saved:
+            logger.info(f"Context: {self._total} tokens sent, {self.last_saved} tokens saved this step")
+
+    def _shorten(self, messages: Sequence[Dict[str, Any]], start: int, end: int,
+                 replacement: Callable[[str], tuple]) -> int:
+        """Replace observations from `start` until the history fits.
+
+        Returns:
+            int: The position to carry on from next time
+        """
+        i = start
+        while i < end and self._total > self.max_tokens:
+            if messages[i]["role"] == "user":
+                text, tokens = replacement(messages[i]["content"])
+                if tokens < self._fitted_counts[i]:
+                    self.fitted[i] = {"role": messages[i]["role"], "content": text}
+                    self._total -= self._fitted_counts[i] - tokens
+                    self._fitted_counts[i] = tokens
+                    if self.last_changed is not None:
+                        self.last_changed.append(i)
+            i += 1
+        return i
+
+    def _drop(self, messages: Sequence[Dict[str, Any]], end: int):
+        """Leave the oldest turns before `end` out of the prompt until it fits.
+
+        A turn is a model response and the messages up to the next one, so
+        the prompt still alternates between tool calls and observations.
+        """
+        i = self.dropped
+        while i < end and self._total > self.max_tokens:
+            j = i + 1
+            while j < end and messages[j]["role"] != "assistant":
+                j += 1
+            if j < len(messages) and messages[j]["role"] != "assistant":
+                # The turn runs into the recent messages, which are kept
+                break
+            self._total -= sum(self._fitted_counts[i:j])
+            i = j
+        if i > self.dropped:
+            logger.info(f"Context: left out messages {self.dropped} to {i - 1} to fit the budget")
+            self.dropped = i
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Agent daemon - keeps warm MCP server sessions behind a local Unix socket.
+
+Starting `server.py` for every CLI call costs an interpreter start, the
+server's imports and the `initialize()`/`list_tools()` handshake. The daemon
+pays that once and serves tool calls to later CLI invocations over a socket,
+using newline-delimited JSON requests of the form
+`{"id": 1, "op": "call_tool", "cwd": "...", "name": "...", "arguments": {...}}`.
+
+Tools such as `run_terminal_command` act on the server's working directory,
+so the daemon keeps one warm session per client working directory.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import anyio
+from mcp import StdioServerParameters
+from mcp.types import CallToolResult, ListToolsResult
+
+from sessions import TRANSPORT_CLOSED, WarmSession, connection_closed
+from telemetry import PrometheusSink, Tracer
+
+logger = logging.getLogger("mcp_simple_agent")
+
+# Tool results can be large, so allow long lines on the socket
+STREAM_LIMIT = 64 * 1024 * 1024
+
+class DaemonError(Exception):
+    """Raised when the daemon rejects or fails a request."""
+
+class AgentDaemon:
+    """Serve warm MCP sessions to CLI clients over a Unix socket."""
+
+    def __init__(
+        self,
+        server_parameters: StdioServerParameters,
+        socket_path: str,
+        max_sessions: int = 4,
+        metrics_port: Optional[int] = None,
+    ):
+        self.server_parameters = server_parameters
+        self.socket_path = socket_path
+        self.max_sessions = max_sessions
+        self.metrics_port = metrics_port
+        self.sessions: "OrderedDict[str, WarmSession]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.metrics = PrometheusSink()
+        self.tracer = Tracer([self.metrics])
+
+    async def get_session(self, cwd: str) -> WarmSession:
+        """Return a warm session for a working directory, starting one if needed."""
+        async with self._lock:
+            warm = self.sessions.get(cwd)
+            if warm is not None and warm.alive:
+                self.sessions.move_to_end(cwd)
+                return warm
+
+            # Evict the least recently used sessions to stay within the limit
+            while len(self.sessions) >= self.max_sessions:
+                old_cwd, old = self.sessions.popitem(last=False)
+                logger.info(f"Evicting warm session for {old_cwd}")
+                await old.stop()
+
+            logger.info(f"Starting warm session for {cwd}")
+            parameters = self.server_parameters.model_copy(update={"cwd": cwd})
+            warm = await WarmSession(parameters).start()
+            self.sessions[cwd] = warm
+            return warm
+
+    async def discard(self, cwd: str, warm: WarmSession):
+        """Stop a session whose server exited; the next request starts a new one."""
+        logger.warning(f"MCP server for {cwd} exited; restarting it on demand")
+        async with self._lock:
+            if self.sessions.get(cwd) is warm:
+                del self.sessions[cwd]
+        await warm.stop()
+
+    @staticmethod
+    async def _call_tool(warm: WarmSession, request: Dict[str, Any]) -> CallToolResult:
+        if warm.session is None:
+            raise anyio.ClosedResourceError()
+        return await warm.session.call_tool(request["name"], request.get("arguments") or {})
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a single decoded request and return the response payload."""
+        op = request.get("op")
+        if op == "ping":
+            return {"server": server_key(self.server_parameters)}
+        if op == "spans":
+            for record in request.get("spans") or []:
+                self.metrics.emit(record)
+            return {}
+        if op == "metrics":
+            return {"metrics": self.metrics.render()}
+
+        cwd = request.get("cwd") or os.getcwd()
+        if op == "attach":
+            if request.get("server") != server_key(self.server_parameters):
+                raise DaemonError(f"Daemon serves {server_key(self.server_parameters)}, not {request.get('server')}")
+            warm = await self.get_session(cwd)
+            return {"tools": warm.tools.model_dump(mode="json", by_alias=True)}
+        if op == "call_tool":
+            warm = await self.get_session(cwd)
+            with self.tracer.span("daemon.call_tool", tool=request["name"]):
+                try:
+                    result = await self._call_tool(warm, request)
+                except TRANSPORT_CLOSED:
+                    # The server had already exited, so the call was never sent
+                    await self.discard(cwd, warm)
+                    result = await self._call_tool(await self.get_session(cwd), request)
+                except Exception as e:
+                    if connection_closed(e):
+                        # The server exited during the call, which may have had effects
+                        await self.discard(cwd, warm)
+                    raise
+            return {"result": result.model_dump(mode="json", by_alias=True)}
+        raise DaemonError(f"Unknown operation: {op}")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+
+        async def respond(request):
+            try:
+                response = await self.handle_request(request)
+            except Exception as e:
+                response = {"error": str(e)}
+            response["id"] = request.get("id")
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        # Requests on one connection run concurrently and may finish out of order
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(respond(json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning(f"Dropping daemon client: {e}")
+        finally:
+            writer.close()
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer Prometheus scrapes of GET /metrics."""
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.metrics.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        """Listen on the socket until cancelled, then stop all sessions."""
+        if os.path.exists(self.socket_path):
+            if await probe_daemon(self.socket_path) is not None:
+                raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        server = await asyncio.start_unix_server(
+            self._handle_client, path=self.socket_path, limit=STREAM_LIMIT
+        )
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Agent daemon listening on {self.socket_path}")
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = await asyncio.start_server(self._handle_http, "127.0.0.1", self.metrics_port)
+            logger.info(f"Serving metrics on http://127.0.0.1:{self.metrics_port}/metrics")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if metrics_server is not None:
+                metrics_server.close()
+            for warm in self.sessions.values():
+                await warm.stop()
+            self.sessions.clear()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+class DaemonClient:
+    """A session-like proxy that forwards MCP calls to the daemon.
+
+    It provides the `list_tools` and `call_tool` methods the agent uses on a
+    `ClientSession`, so it can be dropped in place of a stdio session.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, cwd: str):
+        self.reader = reader
+        self.writer = writer
+        self.cwd = cwd
+        self.tools: Optional[ListToolsResult] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def _read_responses(self):
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(DaemonError("Daemon connection closed"))
+            self._pending.clear()
+
+    async def request(self, op: str, **payload) -> Dict[str, Any]:
+        """Send a request and wait for its response."""
+        if self._reader_task.done():
+            raise DaemonError("Daemon connection closed")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        request = {"id": request_id, "op": op, "cwd": self.cwd, **payload}
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        response = await future
+        if "error" in response:
+            raise DaemonError(response["error"])
+        return response
+
+    async def attach(self, server: list):
+        """Attach to (or start) the warm session for this client's directory."""
+        response = await self.request("attach", server=server)
+        self.tools = ListToolsResult.model_validate(response["tools"])
+
+    async def list_tools(self) -> ListToolsResult:
+        return self.tools
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        progress_callback=None) -> CallToolResult:
+        # Progress notifications are not forwarded through the daemon
+        response = await self.request("call_tool", name=name, arguments=arguments or {})
+        return CallToolResult.model_validate(response["result"])
+
+    async def close(self):
+        self._reader_task.cancel()
+        self.writer.close()
+
+def server_key(server_parameters: StdioServerParameters) -> list:
+    """Identify a server so clients can check they attach to the right one."""
+    return [server_parameters.command] + list(server_parameters.args)
+
+async def probe_daemon(socket_path: str) -> Optional[list]:
+    """Return the server key of the daemon answering on the socket, if any."""
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    except OSError:
+        return None
+    try:
+        writer.write(json.dumps({"id": 0, "op": "ping"}).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await asyncio.wait_for(reader.readline(), timeout=2))
+        return response.get("server")
+    except (OSError, ValueError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+
+async def report_spans(socket_path: str, spans: list):
+    """Send finished spans to the daemon's metrics, ignoring failures."""
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    except OSError as e:
+        logger.warning(f"Could not report spans to the daemon: {e}")
+        return
+    try:
+        writer.write(json.dumps({"id": 0, "op": "spans", "spans": spans}, default=str).encode() + b"\n")
+        await writer.drain()
+        await asyncio.wait_for(reader.readline(), timeout=5)
+    except (OSError, asyncio.TimeoutError) as e:
+        logger.warning(f"Could not report spans to the daemon: {e}")
+    finally:
+        writer.close()
+
+async def daemon_serves(socket_path: str, server_parameters: StdioServerParameters) -> bool:
+    """Check whether a daemon for this server is answering on the socket."""
+    return await probe_daemon(socket_path) == server_key(server_parameters)
+
+@asynccontextmanager
+async def connect(
+    socket_path: str,
+    server_parameters: StdioServerParameters,
+    cwd: Optional[str] = None,
+) -> AsyncIterator[DaemonClient]:
+    """Attach to a running daemon and yield a session-like client."""
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    client = DaemonClient(reader, writer, cwd or os.getcwd())
+    try:
+        await client.attach(server_key(server_parameters))
+        yield client
+    finally:
+        await client.close()
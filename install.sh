@@ -74,4 +74,5 @@ echo ""
 echo "Additional options:"
 echo "  --logs-dir, -l: Specify a custom logs directory"
 echo "  --server, -s: Specify a custom server script"
+echo "  --daemon: Keep server sessions warm for later calls"
 echo "  --verbose, -v: Enable verbose logging" 
\ No newline at end of file
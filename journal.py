@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Step journal - crash-safe, append-only logging of agent messages.
+
+Each message is journaled as soon as it is added, as one JSON line carrying
+the message plus a timestamp, the step number and timing metadata. Writes
+happen on a background thread that batches records and flushes/fsyncs them
+together, so the agent loop never waits on disk I/O. The journal is also a
+regular JSONL log: a run that crashed or was interrupted can be resumed from
+it with `recover`.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("mcp_simple_agent")
+
+_CLOSE = object()
+
+class StepJournal:
+    """Append-only JSONL journal written by a background thread.
+
+    Args:
+        path: Journal file, created or appended to
+        flush_interval: Longest time a record waits before being written
+        fsync: Whether to fsync after each batch of records
+        truncate: Start the file empty instead of appending to it
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.2, fsync: bool = True,
+                 truncate: bool = False):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.truncate = truncate
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> "StepJournal":
+        """Start the writer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name="step-journal", daemon=True)
+            self._thread.start()
+        return self
+
+    def append(self, record: Dict[str, Any]):
+        """Queue a record for writing, stamping it with the current time."""
+        if self._thread is None:
+            self.open()
+        self._queue.put({**record, "ts": time.time()})
+
+    def close(self):
+        """Write all queued records and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+            self._thread.join()
+            self._thread = None
+
+    def _write_loop(self):
+        with open(self.path, "w" if self.truncate else "a", encoding="utf-8") as f:
+            closing = False
+            while not closing:
+                batch = [self._queue.get()]
+                # Gather whatever else arrives within the flush interval
+                deadline = time.monotonic() + self.flush_interval
+                while batch[-1] is not _CLOSE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                if batch[-1] is _CLOSE:
+                    batch.pop()
+                    closing = True
+                try:
+                    for record in batch:
+                        f.write(json.dumps(record))
+                        f.write("\n")
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                except (OSError, TypeError, ValueError) as e:
+                    logger.warning(f"Failed to write step journal: {e}")
+
+    @staticmethod
+    def recover(path: str) -> List[Dict[str, Any]]:
+        """Read the messages recorded in a journal or JSONL log.
+
+        A torn final record from a crash mid-write is truncated from the file,
+        so that the journal can be appended to again. So is a final model
+        response whose observation was never recorded, as resuming runs that
+        step again and journals its new response.
+
+        Returns:
+            list: Messages as {"role", "content"} dicts, in order
+        """
+        messages = []
+        good_end = last_start = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    good_end += len(line)
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                messages.append({"role": record["role"], "content": record["content"]})
+                last_start = good_end
+                good_end += len(line)
+        size = os.path.getsize(path)
+        if good_end < size:
+            logger.warning(f"Truncating torn record at the end of {path}")
+        if messages and messages[-1]["role"] == "assistant":
+            messages.pop()
+            good_end = last_start
+        if good_end < size:
+            with open(path, "r+b") as f:
+                f.truncate(good_end)
+        return messages
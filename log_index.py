@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Log index - a SQLite index of the run logs in a logs directory.
+
+For each run the index records the task, step count, tools used, timings and
+final answer, plus the byte offset of every message, so runs can be listed a
+page at a time, searched, and read a slice at a time without opening every
+file. Indexing is incremental: unchanged files are skipped, and a log that
+has grown (a journal still being written) is parsed from where it was left.
+Compact logs (see compact_log.py) are indexed too; their messages are read
+by streaming the file rather than by offset.
+
+The index lives in `index.sqlite` inside the logs directory. It can also be
+queried from the command line, which is how the log viewer uses it:
+
+    python log_index.py list DIR [--offset N] [--limit N] [--query TEXT]
+    python log_index.py messages DIR FILENAME [--start N] [--limit N]
+    python log_index.py refresh DIR
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional
+
+from compact_log import COMPACT_SUFFIX, is_compact, iter_records, read_messages
+
+logger = logging.getLogger("mcp_simple_agent")
+
+INDEX_FILENAME = "index.sqlite"
+FINAL_ANSWER_PREFIX = "Final answer: "
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed_bytes INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    task TEXT,
+    steps INTEGER NOT NULL,
+    tools TEXT NOT NULL,
+    started REAL,
+    ended REAL,
+    final_answer TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_mtime ON runs (mtime_ns);
+CREATE TABLE IF NOT EXISTS messages (
+    filename TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    PRIMARY KEY (filename, position)
+) WITHOUT ROWID;
+"""
+
+def tool_names(content: str) -> List[str]:
+    """Names of the tools called in an assistant message, if it is a tool call."""
+    try:
+        value = json.loads(content)
+    except ValueError:
+        return []
+    if isinstance(value, dict) and isinstance(value.get("calls"), list):
+        value = value["calls"]
+    calls = value if isinstance(value, list) else [value]
+    return [call["name"] for call in calls if isinstance(call, dict) and isinstance(call.get("name"), str)]
+
+class LogIndex:
+    """SQLite index over the run logs in one directory.
+
+    Args:
+        logs_dir: Directory holding the messages_*.jsonl and .tlog logs
+        db_path: Optional index file. Defaults to index.sqlite in logs_dir.
+    """
+
+    def __init__(self, logs_dir: str, db_path: Optional[str] = None):
+        self.logs_dir = logs_dir
+        self.db_path = db_path or os.path.join(logs_dir, INDEX_FILENAME)
+        self.db = sqlite3.connect(self.db_path, timeout=10)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self) -> "LogIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def index_file(self, path: str) -> bool:
+        """Index a log file, parsing only what was appended since last time.
+
+        Returns:
+            bool: Whether the index changed
+        """
+        filename = os.path.basename(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return self.remove(filename)
+
+        row = self.db.execute("SELECT * FROM runs WHERE filename = ?", (filename,)).fetchone()
+        if row is not None and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+            return False
+
+        # Continue from the last indexed message if the file only grew;
+        # compressed logs have no byte offsets, so they are read from the start
+        compact = is_compact(filename)
+        if row is not None and not compact and stat.st_size >= row["indexed_bytes"]:
+            run = dict(row)
+            run["tools"] = json.loads(row["tools"])
+        else:
+            self.db.execute("DELETE FROM messages WHERE filename = ?", (filename,))
+            run = {
+                "indexed_bytes": 0, "message_count": 0, "task": None, "steps": 0,
+                "tools": [], "started": None, "ended": None, "final_answer": None,
+            }
+
+        messages = []
+        if compact:
+            for record in iter_records(path):
+                messages.append((filename, run["message_count"], -1, 0, record["role"]))
+                run["message_count"] += 1
+                self._update_run(run, record["role"], record["content"], record.get("ts"))
+            run["indexed_bytes"] = stat.st_size
+        else:
+            with open(path, "rb") as f:
+                f.seek(run["indexed_bytes"])
+                offset = run["indexed_bytes"]
+                for line in f:
+                    # Stop at a record that is still being written
+                    if not line.endswith(b"\n"):
+                        break
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                            role, content = record["role"], record["content"]
+                        except (ValueError, KeyError, TypeError):
+                            logger.warning(f"Stopped indexing {filename} at unreadable line (byte {offset})")
+                            break
+                        messages.append((filename, run["message_count"], offset, len(line), role))
+                        run["message_count"] += 1
+                        self._update_run(run, role, content, record.get("ts"))
+                    offset += len(line)
+                run["indexed_bytes"] = offset
+
+        self.db.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)", messages)
+        self.db.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (filename, stat.st_size, stat.st_mtime_ns, run["indexed_bytes"], run["message_count"],
+             run["task"], run["steps"], json.dumps(run["tools"]), run["started"], run["ended"],
+             run["final_answer"]),
+        )
+        self.db.commit()
+        return True
+
+    @staticmethod
+    def _update_run(run: Dict[str, Any], role: str, content: str, ts: Optional[float]):
+        if ts is not None:
+            if run["started"] is None:
+                run["started"] = ts
+            run["ended"] = ts
+        if role == "user" and run["task"] is None:
+            run["task"] = content
+        elif role == "assistant":
+            run["steps"] += 1
+            for name in tool_names(content):
+                if name not in run["tools"]:
+                    run["tools"].append(name)
+        elif role == "user" and content.startswith(FINAL_ANSWER_PREFIX):
+            run["final_answer"] = content[len(FINAL_ANSWER_PREFIX):]
+
+    def remove(self, filename: str) -> bool:
+        """Drop a run from the index."""
+        cursor = self.db.execute("DELETE FROM runs WHERE filename = ?", (filename,))
+        self.db.execute("DELETE FROM messages WHERE filename = ?", (filename,))
+        self.db.commit()
+        return cursor.rowcount > 0
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the directory.
+
+        Only files whose size or modification time changed are read.
+
+        Returns:
+            int: Number of runs added, updated or removed
+        """
+        changed = 0
+        present = set()
+        for entry in os.scandir(self.logs_dir):
+            if entry.name.endswith((".jsonl", COMPACT_SUFFIX)) and entry.is_file():
+                present.add(entry.name)
+                changed += self.index_file(entry.path)
+        for (filename,) in self.db.execute("SELECT filename FROM runs").fetchall():
+            if filename not in present:
+                changed += self.remove(filename)
+        return changed
+
+    def sync(self) -> int:
+        """Index logs added to the directory and drop removed ones.
+
+        Unlike refresh, logs already in the index are not checked for
+        changes: they are indexed as they are saved (see index_log) and when
+        read, so this only lists the directory's file names.
+
+        Returns:
+            int: Number of runs added or removed
+        """
+        present = {}
+        for entry in os.scandir(self.logs_dir):
+            if entry.name.endswith((".jsonl", COMPACT_SUFFIX)) and entry.is_file():
+                present[entry.name] = entry.path
+        indexed = {filename for (filename,) in self.db.execute("SELECT filename FROM runs")}
+        changed = 0
+        for filename in present.keys() - indexed:
+            changed += self.index_file(present[filename])
+        for filename in indexed - present.keys():
+            changed += self.remove(filename)
+        return changed
+
+    def list_runs(self, offset: int = 0, limit: int = 50, query: Optional[str] = None) -> Dict[str, Any]:
+        """List runs, newest first, optionally matching a search query.
+
+        Args:
+            offset: Number of runs to skip
+            limit: Maximum number of runs to return
+            query: Optional text to look for in the task, final answer,
+                   tool names or file name
+
+        Returns:
+            dict: {"total": number of matching runs, "runs": list of run metadata}
+        """
+        where, params = "", []
+        if query:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where = ("WHERE task LIKE ? ESCAPE '\\' OR final_answer LIKE ? ESCAPE '\\' "
+                     "OR tools LIKE ? ESCAPE '\\' OR filename LIKE ? ESCAPE '\\'")
+            params = [pattern] * 4
+        total = self.db.execute(f"SELECT COUNT(*) FROM runs {where}", params).fetchone()[0]
+        rows = self.db.execute(
+            f"SELECT * FROM runs {where} ORDER BY mtime_ns DESC, filename DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        runs = [
+            {
+                "filename": row["filename"],
+                "task": row["task"],
+                "steps": row["steps"],
+                "messages": row["message_count"],
+                "tools": json.loads(row["tools"]),
+                "started": row["started"],
+                "duration": round(row["ended"] - row["started"], 3) if row["started"] is not None else None,
+                "final_answer": row["final_answer"],
+                "size": row["size"],
+            }
+            for row in rows
+        ]
+        return {"total": total, "runs": runs}
+
+    def get_messages(self, filename: str, start: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Read a range of a run's messages using the indexed byte offsets.
+
+        Returns:
+            dict: {"total": number of messages in the run, "messages": list of {"role", "content"}}
+        """
+        self.index_file(os.path.join(self.logs_dir, filename))
+        row = self.db.execute("SELECT message_count FROM runs WHERE filename = ?", (filename,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Log file not found: {filename}")
+        if is_compact(filename):
+            path = os.path.join(self.logs_dir, filename)
+            return {"total": row["message_count"], "messages": read_messages(path, start, limit)}
+        spans = self.db.execute(
+            "SELECT offset, length FROM messages WHERE filename = ? AND position >= ? "
+            "ORDER BY position LIMIT ?",
+            (filename, start, -1 if limit is None else limit),
+        ).fetchall()
+
+        messages = []
+        if spans:
+            # Messages are contiguous in the file, so one read covers the range
+            first = spans[0]["offset"]
+            end = spans[-1]["offset"] + spans[-1]["length"]
+            with open(os.path.join(self.logs_dir, filename), "rb") as f:
+                f.seek(first)
+                data = f.read(end - first)
+            for span in spans:
+                record = json.loads(data[span["offset"] - first:span["offset"] - first + span["length"]])
+                messages.append({"role": record["role"], "content": record["content"]})
+        return {"total": row["message_count"], "messages": messages}
+
+def index_log(path: str):
+    """Add or update one log file in its directory's index, logging any failure."""
+    try:
+        with LogIndex(os.path.dirname(path)) as index:
+            index.index_file(path)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Failed to index log {path}: {e}")
+
+def main(argv: Optional[List[str]] = None):
+    """Command line interface, printing JSON results to stdout."""
+    parser = argparse.ArgumentParser(description="Query the index of agent run logs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List runs, newest first")
+    list_parser.add_argument("logs_dir")
+    list_parser.add_argument("--offset", type=int, default=0)
+    list_parser.add_argument("--limit", type=int, default=50)
+    list_parser.add_argument("--query", "-q", help="Only runs whose task, answer or tools contain this text")
+
+    messages_parser = subparsers.add_parser("messages", help="Print a range of a run's messages")
+    messages_parser.add_argument("logs_dir")
+    messages_parser.add_argument("filename")
+    messages_parser.add_argument("--start", type=int, default=0)
+    messages_parser.add_argument("--limit", type=int)
+
+    refresh_parser = subparsers.add_parser("refresh", help="Update the index")
+    refresh_parser.add_argument("logs_dir")
+
+    args = parser.parse_args(argv)
+    if os.sep in getattr(args, "filename", "") or getattr(args, "filename", "").startswith(".."):
+        parser.error("filename must be a file name, not a path")
+
+    with LogIndex(args.logs_dir) as index:
+        if args.command == "list":
+            index.sync()
+            result = index.list_runs(args.offset, args.limit, args.query)
+        elif args.command == "messages":
+            try:
+                result = index.get_messages(args.filename, args.start, args.limit)
+            except FileNotFoundError as e:
+                print(json.dumps({"error": str(e)}))
+                sys.exit(2)
+        else:
+            result = {"changed": index.refresh()}
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
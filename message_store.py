@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Message store - the agent's conversation memory.
+
+The store is a list of {"role", "content"} dicts, which is what
+`MCPSimpleAgent.messages` has always been, and it can be changed like one.
+Each message dict also caches what the agent derives from it: the
+OpenAI-format message sent to the model and its token count. The history
+mostly grows by one message at a time, so building the prompt each step
+reuses the cached payloads of all earlier messages and only does work for
+the new ones, and the per-step cost stays flat on long runs.
+
+Any other change, through the list or to a message dict in place, marks the
+prompt as out of date from that position, and the next prompt is rebuilt
+from there.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from context_budget import ContextBudget, TokenCounter
+
+def openai_message(role: str, content: str) -> Dict[str, Any]:
+    """A message in the OpenAI chat format."""
+    return {"role": role, "content": [{"type": "text", "text": content}]}
+
+def _text_length(message: Dict[str, Any]) -> int:
+    return sum(len(part.get("text", "")) for part in message["content"])
+
+class PromptMessages(list):
+    """OpenAI-format messages that keep running totals of their size.
+
+    `chars` and `assistant_turns` let the prompt's users (the scheduler's
+    token estimate and priority, the prompt.build span) skip rescanning it.
+    Items must be added and replaced with `push` and `put` to keep the
+    totals right.
+    """
+
+    __slots__ = ("chars", "assistant_turns")
+
+    def __init__(self):
+        super().__init__()
+        self.chars = 0
+        self.assistant_turns = 0
+
+    def _count(self, message: Dict[str, Any], sign: int):
+        self.chars += sign * _text_length(message)
+        self.assistant_turns += sign * (message["role"] == "assistant")
+
+    def push(self, message: Dict[str, Any]):
+        self.append(message)
+        self._count(message, 1)
+
+    def put(self, index: int, message: Dict[str, Any]):
+        self._count(self[index], -1)
+        self[index] = message
+        self._count(message, 1)
+
+    def drop_range(self, start: int, stop: int):
+        for message in self[start:stop]:
+            self._count(message, -1)
+        del self[start:stop]
+
+def prompt_chars(messages: List[Dict[str, Any]]) -> int:
+    """Characters of text in OpenAI-format messages."""
+    chars = getattr(messages, "chars", None)
+    return chars if chars is not None else sum(_text_length(message) for message in messages)
+
+class Message(dict):
+    """A {"role", "content"} message that caches its derived payloads.
+
+    Changing it in place drops them and tells the store holding it.
+    Copies and pickles are plain dicts.
+    """
+
+    __slots__ = ("_store", "_position", "_openai", "_tokens", "_counter")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._store: Optional["MessageStore"] = None
+        self._position = 0
+        self._openai: Optional[Dict[str, Any]] = None
+        self._tokens = 0
+        self._counter = None
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def _changed(self):
+        self._openai = self._counter = None
+        if self._store is not None:
+            self._store._invalidate(self._position)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def openai(self) -> Dict[str, Any]:
+        if self._openai is None:
+            self._openai = openai_message(self["role"], self["content"])
+        return self._openai
+
+    def tokens(self, counter: "TokenCounter") -> int:
+        if self._counter is not counter:
+            self._tokens = counter.count(self["content"])
+            self._counter = counter
+        return self._tokens
+
+class MessageStore(list):
+    """Conversation history: a list of message dicts that caches its prompt.
+
+    Messages added to the store are copied into `Message` dicts. Changes
+    other than adding messages at the end make the next `openai_messages`
+    call rebuild the prompt from the first changed position.
+
+    Args:
+        messages: Optional initial {"role", "content"} dicts
+    """
+
+    def __init__(self, messages: Iterable[Dict[str, str]] = ()):
+        super().__init__()
+        # Payloads of the first messages, extended as messages are added;
+        # those from `_valid` on are out of date
+        self._openai = PromptMessages()
+        self._counts: List[int] = []
+        self._valid = 0
+        # The last prompt fitted to a context budget, the number of messages
+        # it covers, and where the turns it leaves out end (see ContextBudget)
+        self._budget: Optional["ContextBudget"] = None
+        self._fitted = PromptMessages()
+        self._fitted_until = 0
+        self._dropped = 2
+        self.extend(messages)
+
+    def __reduce__(self):
+        return (MessageStore, (list(self),))
+
+    def __repr__(self) -> str:
+        return f"MessageStore({list.__repr__(self)})"
+
+    def _adopt(self, message: Dict[str, str], position: int) -> Message:
+        message = Message(message)
+        message._store, message._position = self, position
+        return message
+
+    @staticmethod
+    def _release(messages: Iterable[Message]):
+        for message in messages:
+            message._store = None
+
+    def _invalidate(self, position: int):
+        self._valid = min(self._valid, position)
+
+    def _first(self, index: slice) -> int:
+        return min(range(*index.indices(len(self))), default=index.indices(len(self))[0])
+
+    def append(self, message: Dict[str, str]):
+        super().append(self._adopt(message, len(self)))
+
+    def extend(self, messages: Iterable[Dict[str, str]]):
+        for message in messages:
+            self.append(message)
+
+    def __iadd__(self, messages: Iterable[Dict[str, str]]):
+        self.extend(messages)
+        return self
+
+    def __imul__(self, n: int):
+        if n > 0:
+            self.extend(list(self) * (n - 1))
+        else:
+            self.clear()
+        return self
+
+    def insert(self, index: int, message: Dict[str, str]):
+        index = self._first(slice(index, index))
+        super().insert(index, self._adopt(message, index))
+        self._invalidate(index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            first = self._first(index)
+            self._release(self[index])
+            super().__setitem__(index, [self._adopt(message, first) for message in value])
+        else:
+            first = range(len(self))[index]
+            self._release([self[first]])
+            super().__setitem__(first, self._adopt(value, first))
+        self._invalidate(first)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            first = self._first(index)
+            self._release(self[index])
+        else:
+            first = range(len(self))[index]
+            self._release([self[first]])
+        super().__delitem__(index)
+        self._invalidate(first)
+
+    def pop(self, index: int = -1) -> Message:
+        position = range(len(self))[index]
+        message = super().pop(position)
+        self._release([message])
+        self._invalidate(position)
+        return message
+
+    def remove(self, message: Dict[str, str]):
+        del self[self.index(message)]
+
+    def clear(self):
+        del self[:]
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate(0)
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate(0)
+
+    def openai_messages(self, budget: Optional["ContextBudget"] = None) -> PromptMessages:
+        """The history in OpenAI format, fitted to a context budget if given.
+
+        Only messages added or changed since the last call are converted,
+        counted and fitted. The returned list is the store's own, which later
+        calls update in place, so callers must not modify it or keep it past
+        the model call.
+        """
+        valid = min(self._valid, len(self))
+        if valid < len(self._openai):
+            self._openai.drop_range(valid, len(self._openai))
+            del self._counts[valid:]
+        if valid < self._fitted_until:
+            # The budget can only carry on from an unchanged history
+            self._fitted_until = 0
+        for position in range(len(self._openai), len(self)):
+            message = self[position]
+            message._position = position
+            self._openai.push(message.openai())
+        self._valid = len(self)
+        if budget is None:
+            return self._openai
+
+        if budget is not self._budget:
+            self._budget, self._counts, self._fitted_until = budget, [], 0
+        for message in self[len(self._counts):]:
+            self._counts.append(message.tokens(budget.counter))
+        unchanged = self._fitted_until
+        budget.update(self, self._counts, unchanged)
+        fitted, dropped, changed = budget.fitted, budget.dropped, budget.last_changed
+        if changed is None:
+            # The budget started over
+            self._fitted, self._dropped = PromptMessages(), 2
+            unchanged, changed = 0, range(len(self))
+        for message in self._openai[unchanged:]:
+            self._fitted.push(message)
+        self._fitted_until = len(self)
+        if dropped > self._dropped:
+            self._fitted.drop_range(2, 2 + dropped - self._dropped)
+            self._dropped = dropped
+        for i in changed:
+            if i >= dropped and fitted[i] is not self[i]:
+                self._fitted.put(i - dropped + 2, openai_message(fitted[i]["role"], fitted[i]["content"]))
+        return self._fitted
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Observation store - spill large tool outputs to disk and page through them.
+
+Observations over a size threshold are appended to a temporary spill file;
+the conversation gets a head/tail preview plus a handle instead. The model
+can then read any window of the full output with the built-in
+`read_observation(handle, offset, length)` tool, served from a memory map of
+the spill file, so memory and prompt size stay flat however large the
+observations are.
+"""
+
+import mmap
+import os
+import tempfile
+from typing import Dict, Optional, Tuple
+
+READ_OBSERVATION = "read_observation"
+READ_OBSERVATION_HELP = (
+    f"- {READ_OBSERVATION}(handle: str, offset: int = 0, length: int = 4000): "
+    "Read part of a large observation that was shortened, starting at a byte offset\n"
+)
+
+class ObservationStore:
+    """Spill file for large observations, read back through a memory map.
+
+    Args:
+        threshold: Observations longer than this many characters are spilled
+        preview_chars: Characters of the head and of the tail kept in the preview
+        max_read: Largest window `read` returns at once
+        directory: Directory for the spill file (defaults to the temp directory)
+    """
+
+    def __init__(self, threshold: int = 20000, preview_chars: int = 2000,
+                 max_read: int = 16000, directory: Optional[str] = None):
+        self.threshold = threshold
+        self.preview_chars = preview_chars
+        self.max_read = max_read
+        self.directory = directory
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._size = 0
+        self._handles: Dict[str, Tuple[int, int]] = {}
+
+    def store(self, text: str) -> str:
+        """Return the text itself if small, else spill it and return a preview."""
+        if len(text) <= self.threshold:
+            return text
+
+        data = text.encode()
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.directory, prefix="observations-")
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._file.flush()
+        handle = f"obs-{len(self._handles) + 1}"
+        self._handles[handle] = (self._size, len(data))
+        self._size += len(data)
+
+        n = self.preview_chars
+        return (
+            f"[Large observation {handle}: {len(data)} bytes. Showing the first and last "
+            f"{n} characters; use {READ_OBSERVATION} with handle \"{handle}\" to read the rest.]\n"
+            f"{text[:n]}\n[...]\n{text[-n:]}"
+        )
+
+    def read(self, handle: str, offset: int = 0, length: int = 4000) -> str:
+        """Read a window of a spilled observation by byte offset."""
+        if handle not in self._handles:
+            raise ValueError(f"Unknown observation handle: {handle}")
+        start, size = self._handles[handle]
+        offset = max(0, int(offset))
+        length = max(0, min(int(length), self.max_read))
+        if offset >= size:
+            return f"[{handle}: offset {offset} is past the end ({size} bytes)]"
+
+        # Remap when the spill file has grown since the map was created
+        if self._map is None or len(self._map) < self._size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+
+        end = min(offset + length, size)
+        window = self._map[start + offset:start + end].decode(errors="replace")
+        return f"[{handle}: bytes {offset}-{end} of {size}]\n{window}"
+
+    def close(self):
+        """Close the memory map and delete the spill file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._handles.clear()
+        self._size = 0
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Model response cache - content-addressed record/replay of model outputs.
+
+Responses are keyed by a hash of the request parameters (model, temperature,
+max_tokens) and the full message list, and stored as zlib-compressed files in
+a sharded directory. The least recently used entries are evicted once the
+cache grows past its size limit.
+
+In replay mode a cache miss raises CacheMissError instead of calling the
+model, so recorded trajectories can be rerun fully offline.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+import zlib
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("mcp_simple_agent")
+
+class CacheMissError(Exception):
+    """Raised in replay mode when a request has no recorded response."""
+
+def is_async_model(model_function) -> bool:
+    """Whether a model function is a coroutine or async generator function.
+
+    A plain function's __call__ is a method-wrapper, which inspect never
+    reports as async, so __call__ is only looked at for callable objects.
+    """
+    call = getattr(type(model_function), "__call__", None)
+    return any(
+        inspect.iscoroutinefunction(function) or inspect.isasyncgenfunction(function)
+        for function in (model_function, call)
+    )
+
+class ResponseCache:
+    """A size-bounded on-disk cache of model responses."""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, replay: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    def _entry_paths(self) -> List[str]:
+        paths = []
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                paths.extend(entry.path for entry in os.scandir(shard.path) if entry.is_file())
+        return paths
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    @staticmethod
+    def key(params: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+        """Hash request parameters and messages into a cache key."""
+        canonical = json.dumps([params, messages], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a recorded response, marking it as recently used."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                text = zlib.decompress(f.read()).decode()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Ignoring unreadable response cache entry {path}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        """Record a response, evicting old entries if over the size limit."""
+        path = self._path(key)
+        data = zlib.compress(text.encode(), 6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.total_bytes += len(data) - previous
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is 90% full."""
+        entries = []
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        self.total_bytes = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self.total_bytes -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "bytes": self.total_bytes}
+
+    def wrap(self, model_function, **params):
+        """Wrap a model function so its responses are recorded and replayed.
+
+        Args:
+            model_function: The model function to wrap (sync, async or streaming)
+            **params: Request parameters that affect the response, included
+                     in the cache key alongside the messages
+
+        Returns:
+            An async generator model function yielding the response text
+        """
+        is_async = is_async_model(model_function)
+
+        async def cached_model(messages):
+            key = self.key(params, messages)
+            text = self.get(key)
+            if text is not None:
+                yield text
+                return
+            if self.replay:
+                raise CacheMissError(f"No recorded response for request {key[:12]}")
+
+            if is_async:
+                output = model_function(messages)
+            else:
+                output = await asyncio.to_thread(model_function, messages)
+            if inspect.isawaitable(output):
+                output = await output
+            if not hasattr(output, "__aiter__"):
+                self.put(key, output)
+                yield output
+                return
+
+            # Record the streamed text once the stream ends or the caller
+            # stops reading because the tool call is complete
+            chunks = []
+            try:
+                async for chunk in output:
+                    chunks.append(chunk)
+                    yield chunk
+            except GeneratorExit:
+                self.put(key, "".join(chunks))
+                raise
+            finally:
+                aclose = getattr(output, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            self.put(key, "".join(chunks))
+
+        return cached_model
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Request scheduler - share the model provider's rate limits across agents.
+
+All model calls in a process go through one RequestScheduler, which admits
+a request only when token buckets for requests per minute and tokens per
+minute have room, so a burst of agents queues up instead of running into
+429 errors. Waiting requests are admitted in priority order: calls of
+trajectories that are further along go first, so runs in flight finish
+before new ones start. Rate limit and transient errors are retried with
+jittered exponential backoff, honouring the provider's Retry-After, and a
+rate limit error pauses all requests.
+
+The time a request spent queued is added to the current telemetry span
+(the agent's `model.call`) as `queue_delay`, and totals are kept in `stats()`.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from telemetry import current_span
+
+logger = logging.getLogger("mcp_simple_agent")
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRY_STATUS = {408, 409, 429}
+RETRY_ERRORS = {"APIConnectionError", "APITimeoutError"}
+
+class TokenBucket:
+    """A bucket refilled continuously up to a per-minute limit.
+
+    Args:
+        per_minute: Capacity, refilled over a minute (0 for no limit)
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` can be taken."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """The delay a provider asked for in a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUS or status >= 500
+    return type(error).__name__ in RETRY_ERRORS
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Cheap estimate of the prompt tokens of OpenAI-format messages.
+
+    Uses the running `chars` total of the agent's prompt (see
+    message_store.PromptMessages) instead of rescanning it, when present.
+    """
+    chars = getattr(messages, "chars", None)
+    if chars is None:
+        chars = 0
+        for message in messages:
+            content = message["content"]
+            chars += len(content) if isinstance(content, str) else sum(len(part.get("text", "")) for part in content)
+    return chars // 4 + 4 * len(messages)
+
+class RequestScheduler:
+    """Admit model requests within rate limits, by priority, with retries.
+
+    Args:
+        requests_per_minute: Request rate limit (0 for no limit)
+        tokens_per_minute: Token rate limit (0 for no limit)
+        max_retries: Retries of a rate limited or failed request
+        base_delay: First backoff delay in seconds, doubled on each retry
+        max_delay: Maximum backoff delay in seconds
+    """
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200000,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._paused_until = 0.0
+        self.admitted = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    async def acquire(self, tokens: int, priority: int = 0) -> float:
+        """Wait until a request may be sent; lower priorities go first.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        entry = (priority, next(self._sequence))
+        start = time.monotonic()
+        async with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == entry:
+                        timeout = max(
+                            self._paused_until - time.monotonic(),
+                            self.requests.delay(1),
+                            self.tokens.delay(tokens),
+                        )
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                self.requests.take(1)
+                self.tokens.take(tokens)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+        delay = time.monotonic() - start
+        self.admitted += 1
+        self.total_queue_delay += delay
+        self.max_queue_delay = max(self.max_queue_delay, delay)
+        return delay
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Jittered exponential delay before a retry, at least any Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(error)
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        if getattr(error, "status_code", None) == 429:
+            # Everyone is over the limit: hold back all requests
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    async def run(self, send: Callable[[], Awaitable[Any]], tokens: int, priority: int = 0) -> Any:
+        """Send a request once admitted, retrying rate limit and transient errors.
+
+        Args:
+            send: Coroutine function that sends the request
+            tokens: Estimated tokens of the request, prompt plus completion
+            priority: Admission priority; lower goes first
+        """
+        queue_delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            queue_delay += await self.acquire(tokens, priority)
+            try:
+                result = await send()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    self.failures += 1
+                    raise
+                delay = self.backoff(attempt, e)
+                self.retries += 1
+                logger.warning(f"Model request failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            span = current_span()
+            if span is not None:
+                span.set(queue_delay=round(queue_delay, 6), retries=attempt)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and queueing delays."""
+        return {
+            "admitted": self.admitted,
+            "retries": self.retries,
+            "failures": self.failures,
+            "queued": len(self._waiting),
+            "avg_queue_delay": round(self.total_queue_delay / self.admitted, 3) if self.admitted else 0.0,
+            "max_queue_delay": round(self.max_queue_delay, 3),
+        }
+
+def trajectory_priority(messages: List[Dict[str, Any]]) -> int:
+    """Priority of a model call: trajectories with more steps done go first."""
+    turns = getattr(messages, "assistant_turns", None)
+    if turns is None:
+        turns = sum(1 for message in messages if message["role"] == "assistant")
+    return -turns
@@ -1,10 +1,97 @@
+import asyncio
+import importlib.util
+import json
+import os
+import secrets
+import shlex
+import shutil
+import signal
+import sys
+import time
 import httpx
 import subprocess
-from mcp.server.fastmcp import FastMCP
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+from mcp.server.fastmcp import Context, FastMCP
 
-mcp = FastMCP("AiderServer", dependencies=["aider"])
+# Weather lookups, overridable through the environment (e.g. to point them at
+# a local stand-in server)
+WEATHER_URL = os.environ.get("AGENT_WEATHER_URL", "https://wttr.in")
+WEATHER_CACHE_TTL = float(os.environ.get("AGENT_WEATHER_CACHE_TTL", "60"))
+WEATHER_CONCURRENCY = int(os.environ.get("AGENT_WEATHER_CONCURRENCY", "8"))
+HTTP_TIMEOUT = float(os.environ.get("AGENT_HTTP_TIMEOUT", "15"))
 
-@mcp.tool()
+# HTTP/2 needs the optional h2 package (pip install 'httpx[http2]')
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# One pooled client for the server's lifetime, so lookups reuse connections
+http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """The server's pooled HTTP client, created on first use."""
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            base_url=WEATHER_URL,
+            http2=HTTP2_AVAILABLE,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=WEATHER_CONCURRENCY * 2, keepalive_expiry=60),
+        )
+    return http_client
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Open the pooled HTTP client at startup and close it at shutdown."""
+    global http_client
+    get_http_client()
+    try:
+        yield {}
+    finally:
+        shell_session.close()
+        if http_client is not None:
+            await http_client.aclose()
+            http_client = None
+
+mcp = FastMCP("AiderServer", dependencies=["aider"], lifespan=lifespan)
+
+# Limits for run_terminal_command, overridable through the environment
+COMMAND_TIMEOUT = float(os.environ.get("AGENT_COMMAND_TIMEOUT", "120"))
+OUTPUT_LIMIT = int(os.environ.get("AGENT_OUTPUT_LIMIT", str(64 * 1024)))
+PROGRESS_INTERVAL = 0.5
+# Run commands in one long-lived shell, so cd and exports carry over (opt-in)
+PERSISTENT_SHELL = os.environ.get("AGENT_PERSISTENT_SHELL", "") not in ("", "0")
+
+# Warm Aider sessions for run_aider, overridable through the environment
+AIDER_TIMEOUT = float(os.environ.get("AGENT_AIDER_TIMEOUT", "600"))
+AIDER_IDLE_TIMEOUT = float(os.environ.get("AGENT_AIDER_IDLE_TIMEOUT", "900"))
+AIDER_MAX_SESSIONS = int(os.environ.get("AGENT_AIDER_SESSIONS", "4"))
+AIDER_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aider_worker.py")
+AIDER_FRAME_LIMIT = 16 * 1024 * 1024
+
+# Shell commands that only read the working directory, so their output can be
+# cached until its files change. No pipes, redirects, substitutions or escapes,
+# and no paths outside the directory: none starting with / or ~, and no "..".
+READ_ONLY_COMMANDS = (
+    r"(?!.*(^|[\s='\":])[/~])(?!.*\.\.)"
+    r"\s*(ls|cat|head|tail|wc|pwd|tree|du|stat|file|grep|git (status|log|diff|show|branch))\b[^;&|<>`$()\\\n]*"
+)
+
+# Recent weather responses by city: (expiry time, text)
+weather_cache: Dict[str, Tuple[float, str]] = {}
+
+async def _fetch_weather(city: str) -> str:
+    key = city.strip().lower()
+    cached = weather_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    response = await get_http_client().get(f"/{city}", params={"format": "4"})
+    response.raise_for_status()
+    if WEATHER_CACHE_TTL > 0:
+        weather_cache[key] = (time.monotonic() + WEATHER_CACHE_TTL, response.text)
+    return response.text
+
+@mcp.tool(meta={"cache": {"ttl": 600}})
 async def fetch_weather(city: str) -> str:
     """
     Fetch the weather for a given city.
@@ -13,46 +100,540 @@ async def fetch_weather(city: str) -> str:
     Returns:
         str: The weather for the given city
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"https://wttr.in/{city}?format=4")
-        return response.text
+    return await _fetch_weather(city)
 
+@mcp.tool(meta={"cache": {"ttl": 600}})
+async def fetch_weather_batch(cities: list[str]) -> str:
+    """
+    Fetch the weather for several cities at once.
+    Args:
+        cities: The names of the cities to fetch the weather for
+    Returns:
+        str: The weather for each city, one per line
+    """
+    limit = asyncio.Semaphore(WEATHER_CONCURRENCY)
+    async def fetch(city: str) -> str:
+        async with limit:
+            try:
+                return (await _fetch_weather(city)).strip()
+            except httpx.HTTPError as e:
+                return f"{city}: Error: {e}"
+    cities = list(dict.fromkeys(cities))
+    return "\n".join(await asyncio.gather(*(fetch(city) for city in cities)))
 
-@mcp.tool()
-async def run_terminal_command(command: str) -> str:
+
+class OutputBuffer:
+    """Capture a stream within a size limit, keeping its head and tail.
+    
+    The first half of the limit holds the start of the output; the rest is a
+    ring buffer holding the most recent bytes. Anything in between is dropped
+    and counted.
+    """
+    
+    def __init__(self, limit: int):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.dropped = 0
+    
+    def write(self, data: bytes):
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        self.tail += data
+        excess = len(self.tail) - self.tail_limit
+        if excess > 0:
+            del self.tail[:excess]
+            self.dropped += excess
+    
+    def text(self) -> str:
+        head = self.head.decode(errors="replace")
+        tail = self.tail.decode(errors="replace")
+        if self.dropped:
+            return f"{head}\n[... {self.dropped} bytes omitted ...]\n{tail}"
+        return head + tail
+
+async def _pump(stream: asyncio.StreamReader, buffer: OutputBuffer, on_data=None):
+    """Copy a subprocess stream into a buffer until EOF."""
+    while chunk := await stream.read(65536):
+        buffer.write(chunk)
+        if on_data is not None:
+            await on_data(chunk)
+
+def _kill_process_group(process: asyncio.subprocess.Process):
+    """Kill a shell and every process it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+class ShellSession:
+    """A long-lived shell that runs commands one at a time, keeping its state.
+    
+    The working directory, exported variables and shell functions carry over
+    from one command to the next. Each command is evaluated in the shell with
+    stdin from /dev/null, then a random sentinel is printed on stdout (with
+    the exit code) and on stderr to mark the end of its output. A command
+    that times out or is cancelled is killed together with the shell; the
+    next command starts a new one.
+    """
+    
+    def __init__(self):
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.lock = asyncio.Lock()
+        self.sentinel = b""
+        self.exit_status: Optional[int] = None
+        self._pending: Dict[str, bytes] = {}
+    
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+    
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            shutil.which("bash") or "/bin/sh",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        self.sentinel = f"__agent_done_{secrets.token_hex(8)}__".encode()
+        self._pending = {"stdout": b"", "stderr": b""}
+    
+    async def _read_until_sentinel(self, name: str, buffer: OutputBuffer, on_data=None) -> Optional[bytes]:
+        """Copy a stream into a buffer up to the sentinel.
+        
+        Returns:
+            bytes: The rest of the sentinel's line, or None if the shell exited
+        """
+        stream = getattr(self.process, name)
+        data, self._pending[name] = self._pending[name], b""
+        # Hold back enough bytes to find a sentinel split across reads
+        keep = len(self.sentinel) - 1
+        while (index := data.find(self.sentinel)) < 0:
+            if len(data) > keep:
+                buffer.write(data[:-keep])
+                if on_data is not None:
+                    await on_data(data[:-keep])
+                data = data[-keep:]
+            chunk = await stream.read(65536)
+            if not chunk:
+                buffer.write(data)
+                return None
+            data += chunk
+        buffer.write(data[:index])
+        if on_data is not None and index:
+            await on_data(data[:index])
+        rest = data[index + len(self.sentinel):]
+        while b"\n" not in rest:
+            chunk = await stream.read(65536)
+            if not chunk:
+                return None
+            rest += chunk
+        # Anything after the sentinel (a background job's output) goes to the next command
+        line, self._pending[name] = rest.split(b"\n", 1)
+        return line
+    
+    async def run(self, command: str, stdout: OutputBuffer, stderr: OutputBuffer, on_data=None) -> Optional[int]:
+        """Run a command in the shell, starting the shell if needed.
+        
+        Returns:
+            int: The command's exit code, or None if it made the shell exit
+        """
+        if not self.alive:
+            await self.start()
+        sentinel = self.sentinel.decode()
+        script = (
+            f"eval {shlex.quote(command)} < /dev/null\n"
+            f"printf '%s %s\\n' {sentinel} \"$?\"\n"
+            f"printf '%s\\n' {sentinel} >&2\n"
+        )
+        try:
+            self.process.stdin.write(script.encode())
+            await self.process.stdin.drain()
+            status, _ = await asyncio.gather(
+                self._read_until_sentinel("stdout", stdout, on_data),
+                self._read_until_sentinel("stderr", stderr, on_data),
+            )
+        except (BrokenPipeError, ConnectionResetError):
+            status = None
+        except BaseException:
+            # Timed out or cancelled mid-command: the shell's state is unknown
+            self.close()
+            raise
+        if status is None:
+            self.exit_status = await self.process.wait()
+            self.process = None
+            return None
+        return int(status)
+    
+    def close(self):
+        """Kill the shell and anything it started."""
+        if self.alive:
+            _kill_process_group(self.process)
+        self.process = None
+
+shell_session = ShellSession()
+
+async def _run_in_shell_session(command: str, timeout: float, stdout: OutputBuffer,
+                                stderr: OutputBuffer, on_data) -> str:
+    """Run a command in the persistent shell and format the result."""
+    async with shell_session.lock:
+        try:
+            returncode = await asyncio.wait_for(
+                shell_session.run(command, stdout, stderr, on_data), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            return (
+                f"Command timed out after {timeout:g}s and was killed, along with the shell; "
+                f"the next command starts a new shell in the server's directory\n"
+                f"Output:\n{stdout.text()}\nErrors:\n{stderr.text()}"
+            )
+        except OSError as e:
+            return f"Error executing command: {str(e)}"
+    if returncode is None:
+        return (
+            f"The shell exited with code {shell_session.exit_status}; "
+            f"the next command starts a new one in the server's directory\n"
+            f"Output:\n{stdout.text()}\nErrors:\n{stderr.text()}"
+        )
+    return f"Exit code: {returncode}\nOutput:\n{stdout.text()}\nErrors:\n{stderr.text()}"
+
+# With a persistent shell a command's output depends on the commands before
+# it (cd, exports), so its results are never cached
+@mcp.tool(meta=None if PERSISTENT_SHELL else {"cache": {
+    "ttl": 300,
+    "watch_cwd": True,
+    "argument_patterns": {"command": READ_ONLY_COMMANDS},
+}})
+async def run_terminal_command(command: str, timeout: Optional[float] = None, ctx: Context = None) -> str:
     """
     Execute a terminal command and return its output.
+    If the server runs a persistent shell, the working directory and
+    environment carry over from one command to the next.
     Args:
         command: The command to execute in the terminal
+        timeout: Seconds to wait before killing the command (defaults to the server limit)
     Returns:
         str: The output from running the command (stdout and stderr combined)
     """
+    timeout = timeout or COMMAND_TIMEOUT
+    stdout = OutputBuffer(OUTPUT_LIMIT)
+    stderr = OutputBuffer(OUTPUT_LIMIT)
+    
+    # Report progress to clients that asked for it, at most every PROGRESS_INTERVAL
+    last_report = 0.0
+    async def report(chunk: bytes):
+        nonlocal last_report
+        now = time.monotonic()
+        if ctx is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            lines = chunk.decode(errors="replace").strip().splitlines()
+            await ctx.report_progress(
+                progress=stdout.total + stderr.total,
+                message=lines[-1] if lines else None,
+            )
+    
+    if PERSISTENT_SHELL:
+        return await _run_in_shell_session(command, timeout, stdout, stderr, report)
+    
     try:
-        result = subprocess.run(
+        process = await asyncio.create_subprocess_shell(
             command,
-            shell=True,
-            capture_output=True,
-            text=True
+            stdin=subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
         )
-        return f"Exit code: {result.returncode}\nOutput:\n{result.stdout}\nErrors:\n{result.stderr}"
     except Exception as e:
         return f"Error executing command: {str(e)}"
+    
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                _pump(process.stdout, stdout, report),
+                _pump(process.stderr, stderr, report),
+                process.wait(),
+            ),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        _kill_process_group(process)
+        await process.wait()
+        return (
+            f"Command timed out after {timeout:g}s and was killed\n"
+            f"Output:\n{stdout.text()}\nErrors:\n{stderr.text()}"
+        )
+    except BaseException:
+        _kill_process_group(process)
+        raise
+    
+    return f"Exit code: {process.returncode}\nOutput:\n{stdout.text()}\nErrors:\n{stderr.text()}"
+
 
 
+class AiderUnavailable(RuntimeError):
+    """Raised when the aider package can't be imported by the worker's Python."""
+
+class AiderSession:
+    """A persistent Aider worker process for one repository and file set.
+    
+    Messages are sent one at a time; the worker keeps Aider's repo map and
+    model setup between them (see aider_worker.py).
+    """
+    
+    def __init__(self, root: str, fnames: tuple):
+        self.root = root
+        self.fnames = fnames
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+    
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+    
+    async def start(self):
+        """Start the worker and wait until Aider is set up."""
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, AIDER_WORKER, *self.fnames,
+            cwd=self.root,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+            limit=AIDER_FRAME_LIMIT,
+        )
+        while True:
+            frame = await self._read_frame()
+            if frame.get("ready"):
+                return self
+            if "error" in frame:
+                await self.close()
+                raise (AiderUnavailable if frame.get("unavailable") else RuntimeError)(frame["error"])
+    
+    async def _read_frame(self) -> dict:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Aider worker exited")
+        return json.loads(line)
+    
+    async def send(self, message: str, on_output=None) -> str:
+        """Send a message and collect Aider's output until it is done."""
+        self.last_used = time.monotonic()
+        output = OutputBuffer(OUTPUT_LIMIT)
+        self.process.stdin.write((json.dumps({"message": message}) + "\n").encode())
+        await self.process.stdin.drain()
+        while not (frame := await self._read_frame()).get("done"):
+            chunk = frame.get("output", "").encode()
+            output.write(chunk)
+            if on_output is not None:
+                await on_output(chunk)
+        self.last_used = time.monotonic()
+        return output.text()
+    
+    async def close(self):
+        """Stop the worker and anything it started."""
+        if self.alive:
+            _kill_process_group(self.process)
+        if self.process is not None:
+            await self.process.wait()
+
+class AiderPool:
+    """Warm Aider sessions keyed by repository root and file set.
+    
+    At most `max_sessions` are kept, evicting the least recently used, and
+    sessions idle for longer than `idle_timeout` seconds are stopped. Workers
+    start outside the pool's lock, so a slow one holds up only the requests
+    waiting for it.
+    """
+    
+    def __init__(self, max_sessions: int, idle_timeout: float):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions: "OrderedDict[tuple, AiderSession]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._starting: Dict[tuple, asyncio.Task] = {}
+        # Number of requests waiting for each startup
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.unavailable: Optional[str] = None
+    
+    async def get(self, root: str, fnames: tuple, timeout: Optional[float] = None) -> AiderSession:
+        """Return a warm session, starting one if needed.
+        
+        Raises:
+            asyncio.TimeoutError: If the worker isn't ready within `timeout`
+                                  seconds. It is stopped once no other
+                                  request is waiting for it.
+        """
+        key = (root, fnames)
+        async with self._lock:
+            if self._reaper is None:
+                self._reaper = asyncio.create_task(self._reap())
+            session = self.sessions.get(key)
+            if session is not None and session.alive:
+                self.sessions.move_to_end(key)
+                return session
+            self.sessions.pop(key, None)
+            
+            starting = self._starting.get(key)
+            if starting is None:
+                # Evict the least recently used sessions that aren't busy
+                for old_key, old in list(self.sessions.items()):
+                    if len(self.sessions) + len(self._starting) < self.max_sessions:
+                        break
+                    if not old.lock.locked():
+                        del self.sessions[old_key]
+                        await old.close()
+                starting = self._starting[key] = asyncio.create_task(self._start(key))
+            self._waiters[starting] = self._waiters.get(starting, 0) + 1
+        
+        # Requests for the same files share one startup; each times out on
+        # its own, and the startup is cancelled when the last one gives up
+        try:
+            return await asyncio.wait_for(asyncio.shield(starting), timeout)
+        finally:
+            self._waiters[starting] -= 1
+            if not self._waiters[starting]:
+                del self._waiters[starting]
+                starting.cancel()
+    
+    async def _start(self, key: tuple) -> AiderSession:
+        session = AiderSession(*key)
+        try:
+            await session.start()
+        except AiderUnavailable as e:
+            self.unavailable = str(e)
+            raise
+        except BaseException:
+            await session.close()
+            raise
+        finally:
+            self._starting.pop(key, None)
+        self.sessions[key] = session
+        return session
+    
+    async def discard(self, session: AiderSession):
+        """Stop a session and drop it from the pool."""
+        async with self._lock:
+            key = (session.root, session.fnames)
+            if self.sessions.get(key) is session:
+                del self.sessions[key]
+        await session.close()
+    
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 1.0))
+            now = time.monotonic()
+            idle = [
+                session for session in list(self.sessions.values())
+                if not session.lock.locked() and now - session.last_used > self.idle_timeout
+            ]
+            for session in idle:
+                await self.discard(session)
+
+aider_pool = AiderPool(AIDER_MAX_SESSIONS, AIDER_IDLE_TIMEOUT)
+
+async def _repo_root(path: str) -> str:
+    """The git repository containing a directory, or the directory itself."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", "rev-parse", "--show-toplevel",
+            cwd=path,
+            stdin=subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return path
+    stdout, _ = await process.communicate()
+    return stdout.decode().strip() if process.returncode == 0 else path
+
+async def _run_aider_once(query: str, fnames: list, timeout: float, on_output) -> str:
+    """Run a one-off `aider --message` process, for when no worker can be started."""
+    output = OutputBuffer(OUTPUT_LIMIT)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "aider", "--message", query, *fnames,
+            stdin=subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        return f"Error running Aider: {e}"
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(_pump(process.stdout, output, on_output), process.wait()),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        _kill_process_group(process)
+        await process.wait()
+        return f"Aider timed out after {timeout:g}s and was stopped\nOutput:\n{output.text()}"
+    except BaseException:
+        _kill_process_group(process)
+        raise
+    return output.text()
 
 @mcp.tool()
-def run_aider(query: str, fnames: list[str]) -> str:
+async def run_aider(query: str, fnames: list[str], timeout: Optional[float] = None, ctx: Context = None) -> str:
     """
     Run an Aider query and return the result.
+    Successive queries on the same files reuse a warm Aider session.
     Args:
         query: The natural language query/instruction to analyze and modify the code
         fnames: List of filenames to analyze/modify
+        timeout: Seconds to wait before stopping Aider (defaults to the server limit)
     Returns:
         str: The result from running the Aider query, including any code changes
         or analysis performed
     """
-    result = subprocess.run(["aider", "--message", query] + fnames, capture_output=True, text=True)    
-    return result.stdout
+    timeout = timeout or AIDER_TIMEOUT
+    
+    # Stream Aider's output to clients that asked for progress
+    received = 0
+    last_report = 0.0
+    async def report(chunk: bytes):
+        nonlocal received, last_report
+        received += len(chunk)
+        now = time.monotonic()
+        if ctx is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            lines = chunk.decode(errors="replace").strip().splitlines()
+            await ctx.report_progress(progress=received, message=lines[-1] if lines else None)
+    
+    deadline = time.monotonic() + timeout
+    cwd = os.getcwd()
+    root = await _repo_root(cwd)
+    key_fnames = tuple(sorted(os.path.relpath(os.path.abspath(f), root) for f in fnames))
+    if aider_pool.unavailable:
+        return await _run_aider_once(query, fnames, timeout, report)
+    try:
+        session = await aider_pool.get(root, key_fnames, timeout=deadline - time.monotonic())
+    except asyncio.TimeoutError:
+        return f"Aider didn't start within {timeout:g}s"
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Falling back to a one-off aider process: {e}", file=sys.stderr)
+        return await _run_aider_once(query, fnames, deadline - time.monotonic(), report)
+    
+    async with session.lock:
+        try:
+            return await asyncio.wait_for(session.send(query, report), timeout=max(0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            await aider_pool.discard(session)
+            return f"Aider timed out after {timeout:g}s and its session was stopped"
+        except (OSError, RuntimeError, ValueError) as e:
+            await aider_pool.discard(session)
+            return f"Error running Aider: {e}"
+        except BaseException:
+            await aider_pool.discard(session)
+            raise
 
 
 if __name__ == "__main__":
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+MCP session helpers - opening stdio sessions, keeping them warm and routing
+tool calls across several servers.
+"""
+
+import asyncio
+import logging
+
+import anyio
+from anyio.abc import ObjectReceiveStream
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, McpError, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.types import CONNECTION_CLOSED, CallToolResult, ListToolsResult, Tool
+
+logger = logging.getLogger("mcp_simple_agent")
+
+@asynccontextmanager
+async def open_stdio_session(server_parameters: StdioServerParameters) -> AsyncIterator[ClientSession]:
+    """Spawn an MCP server over stdio and yield an initialized session."""
+    try:
+        try:
+            async with stdio_client(server_parameters) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    yield session
+        except* anyio.BrokenResourceError:
+            # The server answered a request we had given up on (e.g. a timed out
+            # tool call) while the session was closing; nothing is waiting for it.
+            logger.debug("Dropped late MCP server output during shutdown")
+    except BaseExceptionGroup as group:
+        # The transport's task groups wrap errors raised by the caller; hand
+        # a single one back as it was raised
+        error = group
+        while isinstance(error, BaseExceptionGroup) and len(error.exceptions) == 1:
+            error = error.exceptions[0]
+        if error is group:
+            raise
+        raise error
+
+# Errors of a call on a session whose server had already exited, so the call
+# was never sent and can be retried on a new session
+TRANSPORT_CLOSED = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+def connection_closed(error: BaseException) -> bool:
+    """Whether an error from a session call means its server has exited."""
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, TRANSPORT_CLOSED)
+
+class _ServerOutput(ObjectReceiveStream):
+    """A session's read stream, calling `on_close` once the session is done with it.
+
+    The session closes it after its receive loop ends and it has failed any
+    requests still waiting for a response, which is when a server that
+    exited can be given up on without leaving callers hanging.
+    """
+
+    def __init__(self, stream: ObjectReceiveStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def receive(self):
+        return await self._stream.receive()
+
+    async def aclose(self):
+        await self._stream.aclose()
+        self._on_close()
+
+class WarmSession:
+    """An MCP server process and initialized session kept open across runs.
+
+    The stdio transport uses anyio task groups, which must be entered and
+    exited from the same task, so the session lives inside a dedicated
+    background task until `stop` is called or the server exits.
+    """
+
+    def __init__(self, server_parameters: StdioServerParameters):
+        self.server_parameters = server_parameters
+        self.session: Optional[ClientSession] = None
+        self.tools = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the background task is still holding the session open.
+
+        The task ends when `stop` is called or when the server's stdout
+        closes, so a session whose server exited is no longer alive.
+        """
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> "WarmSession":
+        """Start the server and wait until its session is initialized."""
+        self._task = asyncio.create_task(self._hold())
+        await self._ready.wait()
+        if self.session is None:
+            raise RuntimeError(f"Failed to start MCP server: {self._error}")
+        return self
+
+    def _closed(self):
+        if not self._stop.is_set():
+            logger.warning("MCP server exited")
+            self._stop.set()
+
+    async def _hold(self):
+        try:
+            async with stdio_client(self.server_parameters) as (read_stream, write_stream):
+                async with ClientSession(_ServerOutput(read_stream, self._closed), write_stream) as session:
+                    await session.initialize()
+                    self.tools = await session.list_tools()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except* anyio.BrokenResourceError:
+            logger.debug("Dropped late MCP server output during shutdown")
+        except* Exception as e:
+            self._error = e.exceptions[0]
+            logger.warning(f"MCP server session ended: {self._error}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def stop(self):
+        """Close the session and terminate the server process."""
+        self._stop.set()
+        if self._task is not None:
+            if not self._ready.is_set():
+                # Still starting up: don't wait for a slow server to finish
+                self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+class SessionPool:
+    """A fixed-size pool of warm MCP server sessions.
+
+    Each session is checked out by one agent run at a time, so concurrent
+    runs never share a server process. Sessions whose server died are
+    restarted on checkout.
+    """
+
+    def __init__(self, server_parameters: StdioServerParameters, size: int):
+        self.server_parameters = server_parameters
+        self.size = size
+        self._sessions: List[WarmSession] = []
+        self._idle: "asyncio.Queue[WarmSession]" = asyncio.Queue()
+
+    async def start(self) -> "SessionPool":
+        """Start all server processes concurrently."""
+        self._sessions = await asyncio.gather(*(
+            WarmSession(self.server_parameters).start() for _ in range(self.size)
+        ))
+        for warm in self._sessions:
+            self._idle.put_nowait(warm)
+        return self
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ClientSession]:
+        """Check out an initialized session, waiting for one to become idle."""
+        warm = await self._idle.get()
+        try:
+            # A server that exited ends its session's holder task (see WarmSession)
+            if not warm.alive or warm.session is None:
+                logger.info("Restarting dead MCP server session")
+                await warm.stop()
+                replacement = await WarmSession(self.server_parameters).start()
+                self._sessions[self._sessions.index(warm)] = replacement
+                warm = replacement
+            yield warm.session
+        finally:
+            self._idle.put_nowait(warm)
+
+    async def stop(self):
+        """Stop every server process in the pool."""
+        await asyncio.gather(*(warm.stop() for warm in self._sessions))
+        self._sessions = []
+
+    async def __aenter__(self) -> "SessionPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+class ServerRouter:
+    """Several MCP servers behind the interface of a single session.
+
+    Servers are started concurrently. Startup waits at most `startup_timeout`
+    seconds for all of them (or until the first one is up, if that takes
+    longer); servers that are slower join the tool index when they are ready,
+    which bumps `version`. Tool calls are routed through a dict index. A tool
+    name offered by several servers is listed as `server.tool` for each of
+    them, and every tool can also be called by its qualified name. A server
+    that died is restarted on its next tool call, without touching the others.
+    """
+
+    def __init__(self, servers: Dict[str, StdioServerParameters], startup_timeout: float = 5.0):
+        self.servers = dict(servers)
+        self.startup_timeout = startup_timeout
+        self.sessions: Dict[str, WarmSession] = {}
+        self.version = 0
+        self._tools: Dict[str, Dict[str, Tool]] = {}
+        self._index: Dict[str, Tuple[str, str]] = {}
+        self._listed: List[Tool] = []
+        self._locks = {name: asyncio.Lock() for name in self.servers}
+        self._starting: Dict[str, WarmSession] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> "ServerRouter":
+        """Start every server, returning once the fast ones are ready."""
+        self._tasks = [asyncio.create_task(self._connect(name)) for name in self.servers]
+        _, pending = await asyncio.wait(self._tasks, timeout=self.startup_timeout)
+        while not self.sessions and pending:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if not self.sessions:
+            raise RuntimeError("None of the MCP servers could be started")
+        if pending:
+            logger.info(f"Still starting MCP servers: {', '.join(sorted(self._starting))}")
+        return self
+
+    async def _connect(self, name: str):
+        warm = self._starting[name] = WarmSession(self.servers[name])
+        try:
+            await warm.start()
+        except Exception as e:
+            logger.warning(f"MCP server {name} failed to start: {e}")
+            return
+        finally:
+            self._starting.pop(name, None)
+        self.sessions[name] = warm
+        self._register(name, warm.tools.tools)
+        logger.info(f"MCP server {name} ready with {len(warm.tools.tools)} tools")
+
+    def _register(self, server: str, tools: List[Tool]):
+        """Add or replace a server's tools and rebuild the index."""
+        self._tools[server] = {tool.name: tool for tool in tools}
+        owners: Dict[str, List[str]] = {}
+        for name in sorted(self._tools):
+            for tool_name in self._tools[name]:
+                owners.setdefault(tool_name, []).append(name)
+
+        index: Dict[str, Tuple[str, str]] = {}
+        listed: List[Tool] = []
+        for tool_name, names in owners.items():
+            for name in names:
+                qualified = f"{name}.{tool_name}"
+                index[qualified] = (name, tool_name)
+                if len(names) == 1:
+                    index[tool_name] = (name, tool_name)
+                    listed.append(self._tools[name][tool_name])
+                else:
+                    listed.append(self._tools[name][tool_name].model_copy(update={"name": qualified}))
+        # A name that became ambiguous when a slower server joined keeps
+        # routing to the server that offered it first
+        for tool_name, target in self._index.items():
+            index.setdefault(tool_name, target)
+
+        self._index = index
+        self._listed = listed
+        self.version += 1
+
+    async def list_tools(self) -> ListToolsResult:
+        """The tools of every server that is ready, namespaced on collisions."""
+        return ListToolsResult(tools=list(self._listed))
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs) -> CallToolResult:
+        """Call a tool on the server that offers it, restarting that server if it died."""
+        target = self._index.get(name)
+        if target is None:
+            raise ValueError(f"Tool not found: {name}")
+        server, tool_name = target
+        warm = await self._session_for(server)
+        try:
+            return await warm.session.call_tool(tool_name, arguments, **kwargs)
+        except TRANSPORT_CLOSED:
+            # The server had already exited, so the call was never sent
+            await self._discard(server, warm)
+            warm = await self._session_for(server)
+            return await warm.session.call_tool(tool_name, arguments, **kwargs)
+        except Exception as e:
+            if connection_closed(e):
+                # The server exited during the call, which may have had effects
+                await self._discard(server, warm)
+            raise
+
+    async def _discard(self, server: str, warm: WarmSession):
+        logger.warning(f"MCP server {server} exited; restarting it on demand")
+        await warm.stop()
+
+    async def _session_for(self, server: str) -> WarmSession:
+        async with self._locks[server]:
+            warm = self.sessions[server]
+            if warm.alive and warm.session is not None:
+                return warm
+            logger.info(f"Restarting MCP server {server}")
+            await warm.stop()
+            warm = await WarmSession(self.servers[server]).start()
+            self.sessions[server] = warm
+            self._register(server, warm.tools.tools)
+            return warm
+
+    async def stop(self):
+        """Stop every server, including ones that are still starting."""
+        await asyncio.gather(*(warm.stop() for warm in [*self.sessions.values(), *self._starting.values()]))
+        self.sessions = {}
+
+    async def __aenter__(self) -> "ServerRouter":
+        try:
+            return await self.start()
+        except BaseException:
+            await self.stop()
+            raise
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
@@ -15,7 +15,7 @@ setup(
             "agent=agent_cli:main",
         ],
     },
-    python_requires=">=3.8",
+    python_requires=">=3.11",
     description="A CLI utility for running an AI agent that can execute commands from any directory",
     author="Your Name",
     author_email="your.email@example.com",
@@ -25,8 +25,7 @@ setup(
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
     ],
 ) 
\ No newline at end of file
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Telemetry - timing spans for the agent loop, exported through pluggable sinks.
+
+The agent wraps each phase of a step (prompt build, model call, parse, tool
+dispatch and logging) in a span carrying sizes and token counts, so time can
+be attributed to the model, the MCP round trip or the agent itself. Spans
+nest through a context variable, so concurrent tool calls get the right
+parent. Finished spans are handed to sinks as plain dicts:
+
+    JsonLinesSink: one JSON object per span, to a file or stream
+    OTLPJsonSink: OpenTelemetry OTLP/JSON trace export lines
+    PrometheusSink: aggregated histograms and counters in the Prometheus
+        text format, served by the daemon
+
+Without sinks, spans only measure time for the step journal.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Union
+
+logger = logging.getLogger("mcp_simple_agent")
+
+class Span:
+    """A timed operation with attributes, part of a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "_start")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._start = time.perf_counter()
+
+    def set(self, **attributes):
+        """Add or update attributes."""
+        self.attributes.update(attributes)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the span started, or its duration once ended."""
+        if self.end_ns is not None:
+            return (self.end_ns - self.start_ns) / 1e9
+        return time.perf_counter() - self._start
+
+    def end(self):
+        # Wall-clock start plus a monotonic duration
+        self.end_ns = self.start_ns + int((time.perf_counter() - self._start) * 1e9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration": round(self.elapsed, 6),
+            "attributes": self.attributes,
+        }
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, to attach attributes from code deeper down."""
+    return _current_span.get()
+
+class Tracer:
+    """Create spans and pass them to sinks when they end.
+
+    Args:
+        sinks: Objects with an `emit(record)` method, and optionally `close()`
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None):
+        self.sinks = list(sinks or [])
+
+    @property
+    def recording(self) -> bool:
+        """Whether finished spans go anywhere, i.e. attributes are worth computing."""
+        return bool(self.sinks)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time a block as a child of the current span."""
+        parent = _current_span.get()
+        span = Span(
+            name,
+            parent.trace_id if parent is not None else os.urandom(16).hex(),
+            parent.span_id if parent is not None else None,
+            attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+            if self.sinks:
+                self._emit(span.to_dict())
+
+    def _emit(self, record: Dict[str, Any]):
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:
+                logger.warning(f"Telemetry sink {type(sink).__name__} failed: {e}")
+
+    def close(self):
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+
+class JsonLinesSink:
+    """Write each span as a JSON line.
+
+    Args:
+        target: File path to append to, or an open text stream
+    """
+
+    def __init__(self, target: Union[str, TextIO]):
+        self._owned = isinstance(target, str)
+        self.stream = open(target, "a", encoding="utf-8") if self._owned else target
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+    def close(self):
+        if self._owned:
+            self.stream.close()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class OTLPJsonSink(JsonLinesSink):
+    """Write spans in the OpenTelemetry OTLP/JSON format, one export request per line.
+
+    The output can be loaded by OpenTelemetry collectors' file receiver or
+    posted to an OTLP/HTTP endpoint as is.
+    """
+
+    def __init__(self, target: Union[str, TextIO], service_name: str = "mcp_simple_agent"):
+        super().__init__(target)
+        self.service_name = service_name
+
+    def emit(self, record: Dict[str, Any]):
+        span = {
+            "traceId": record["trace_id"],
+            "spanId": record["span_id"],
+            "name": record["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(record["start_ns"]),
+            "endTimeUnixNano": str(record["end_ns"]),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in record["attributes"].items()
+            ],
+        }
+        if record["parent_id"]:
+            span["parentSpanId"] = record["parent_id"]
+        if "error" in record["attributes"]:
+            span["status"] = {"code": 2, "message": str(record["attributes"]["error"])}
+        super().emit({
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "mcp_simple_agent"}, "spans": [span]}],
+            }]
+        })
+
+class PrometheusSink:
+    """Aggregate spans into Prometheus histograms and counters.
+
+    Span durations become `agent_span_duration_seconds{span="..."}`; numeric
+    attributes such as token counts and payload sizes are summed into
+    `agent_span_attribute_total{span="...",attribute="..."}`; spans that
+    raised are counted in `agent_span_errors_total`.
+    """
+
+    # Attributes that identify a span rather than measure it
+    IDENTIFIERS = {"step", "resumed_after"}
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = {}  # span -> bucket counts, then sum, count
+        self.attributes: Dict[tuple, float] = {}
+        self.errors: Dict[str, int] = {}
+
+    def emit(self, record: Dict[str, Any]):
+        name = record["name"]
+        duration = record["duration"]
+        with self._lock:
+            stats = self.durations.setdefault(name, [0] * len(self.BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(self.BUCKETS):
+                if duration <= bound:
+                    stats[i] += 1
+            stats[-2] += duration
+            stats[-1] += 1
+            for key, value in record["attributes"].items():
+                if key in self.IDENTIFIERS:
+                    continue
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.attributes[(name, key)] = self.attributes.get((name, key), 0) + value
+            if "error" in record["attributes"]:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP agent_span_duration_seconds Duration of agent loop phases.",
+            "# TYPE agent_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            for name, stats in sorted(self.durations.items()):
+                label = f'span="{_escape(name)}"'
+                for bound, count in zip(self.BUCKETS, stats):
+                    lines.append(f'agent_span_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'agent_span_duration_seconds_bucket{{{label},le="+Inf"}} {stats[-1]}')
+                lines.append(f"agent_span_duration_seconds_sum{{{label}}} {stats[-2]}")
+                lines.append(f"agent_span_duration_seconds_count{{{label}}} {stats[-1]}")
+            lines += [
+                "# HELP agent_span_attribute_total Sum of numeric span attributes (tokens, bytes, counts).",
+                "# TYPE agent_span_attribute_total counter",
+            ]
+            for (name, key), value in sorted(self.attributes.items()):
+                lines.append(
+                    f'agent_span_attribute_total{{span="{_escape(name)}",attribute="{_escape(key)}"}} {value}'
+                )
+            lines += [
+                "# HELP agent_span_errors_total Spans that ended with an error.",
+                "# TYPE agent_span_errors_total counter",
+            ]
+            for name, count in sorted(self.errors.items()):
+                lines.append(f'agent_span_errors_total{{span="{_escape(name)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+class BufferSink:
+    """Keep finished spans in memory, e.g. to forward them to the daemon."""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, record: Dict[str, Any]):
+        self.records.append(record)
+
+def _escape(value: str) -> str:
+    return re.sub(r'(["\\])', r"\\\1", value).replace("\n", "\\n")
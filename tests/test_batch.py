@@ -0,0 +1,25 @@
+"""An empty batch finishes without starting anything."""
+
+import asyncio
+import io
+
+from mcp import StdioServerParameters
+
+import batch
+
+def test_empty_batch_starts_no_server(monkeypatch, tmp_path):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("an empty batch started a session pool")
+
+    async def model(messages, **kwargs):
+        raise AssertionError("an empty batch called the model")
+
+    monkeypatch.setattr(batch, "SessionPool", no_pool)
+    output = io.StringIO()
+    stats = asyncio.run(batch.run_batch(
+        [], model, StdioServerParameters(command="false"),
+        logs_dir=str(tmp_path / "logs"), output=output,
+    ))
+    assert stats.summary()["tasks"] == 0
+    assert output.getvalue() == ""
+    assert not (tmp_path / "logs").exists()
@@ -0,0 +1,41 @@
+"""Blob garbage collection leaves alone blobs a writer may be about to use."""
+
+import os
+import time
+
+from compact_log import BLOB_DIRNAME, BLOB_THRESHOLD, BlobStore, collect_garbage, write_compact_log
+
+def age(blobs, digest, seconds):
+    then = time.time() - seconds
+    os.utime(blobs.path(digest), (then, then))
+
+def test_gc_keeps_recent_blobs(tmp_path):
+    blobs = BlobStore(str(tmp_path / BLOB_DIRNAME))
+    old = blobs.put("old" * BLOB_THRESHOLD)
+    new = blobs.put("new" * BLOB_THRESHOLD)
+    age(blobs, old, 7200)
+    assert collect_garbage(str(tmp_path), grace_period=3600) == 1
+    assert sorted(blobs.digests()) == [new]
+
+def test_gc_keeps_reused_blobs(tmp_path):
+    blobs = BlobStore(str(tmp_path / BLOB_DIRNAME))
+    content = "prompt" * BLOB_THRESHOLD
+    digest = blobs.put(content)
+    age(blobs, digest, 7200)
+    # A writer reuses the old blob but has not yet renamed its log into place
+    assert blobs.put(content) == digest
+    assert collect_garbage(str(tmp_path), grace_period=3600) == 0
+    write_compact_log(str(tmp_path / "run.tlog"), [{"role": "system", "content": content}])
+    age(blobs, digest, 7200)
+    assert collect_garbage(str(tmp_path), grace_period=3600) == 0
+    assert list(blobs.digests()) == [digest]
+
+def test_gc_skips_tmp_files(tmp_path):
+    blobs = BlobStore(str(tmp_path / BLOB_DIRNAME))
+    digest = blobs.put("x" * BLOB_THRESHOLD)
+    tmp_file = blobs.path(digest) + ".123.tmp"
+    open(tmp_file, "wb").close()
+    os.utime(tmp_file, (0, 0))
+    age(blobs, digest, 7200)
+    assert collect_garbage(str(tmp_path), grace_period=3600) == 1
+    assert os.path.exists(tmp_file)
@@ -0,0 +1,38 @@
+"""Recovering a journal leaves the file ready to be appended to."""
+
+import json
+
+from journal import StepJournal
+
+def write_records(path, records, tail=""):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+def read_roles(path) -> list:
+    with open(path) as f:
+        return [json.loads(line)["role"] for line in f if line.strip()]
+
+def test_recover_drops_unanswered_model_response(tmp_path):
+    path = tmp_path / "messages.jsonl"
+    write_records(path, [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": "task"},
+        {"role": "assistant", "content": "call"},
+    ], tail='{"role": "us')
+    messages = StepJournal.recover(str(path))
+    assert [m["role"] for m in messages] == ["system", "user"]
+
+    journal = StepJournal(str(path), flush_interval=0, fsync=False).open()
+    journal.append({"role": "assistant", "content": "call again"})
+    journal.close()
+    assert read_roles(path) == ["system", "user", "assistant"]
+
+def test_truncate_starts_a_new_file(tmp_path):
+    path = tmp_path / "messages.jsonl"
+    write_records(path, [{"role": "system", "content": "old"}])
+    journal = StepJournal(str(path), flush_interval=0, fsync=False, truncate=True).open()
+    journal.append({"role": "system", "content": "new"})
+    journal.close()
+    assert read_roles(path) == ["system"]
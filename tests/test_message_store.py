@@ -0,0 +1,51 @@
+"""The message store behaves like a list and keeps its prompt in step with it."""
+
+import json
+
+from context_budget import ContextBudget
+from message_store import MessageStore
+
+def prompt_text(prompt) -> list:
+    return [(message["role"], message["content"][0]["text"]) for message in prompt]
+
+def history_text(store) -> list:
+    return [(message["role"], message["content"]) for message in store]
+
+def test_list_api():
+    store = MessageStore([{"role": "system", "content": "system"}])
+    store.append({"role": "user", "content": "task"})
+    store.extend([{"role": "assistant", "content": "call"}])
+    store += [{"role": "user", "content": "observation"}]
+    assert isinstance(store, list)
+    assert json.loads(json.dumps(store)) == store
+    assert store + [{"role": "user", "content": "more"}] == list(store) + [{"role": "user", "content": "more"}]
+    assert store.pop() == {"role": "user", "content": "observation"}
+    assert len(store) == 3
+
+def test_prompt_follows_changes():
+    store = MessageStore([{"role": "system", "content": "system"}, {"role": "user", "content": "task"}])
+    for step in range(5):
+        store.append({"role": "assistant", "content": f"call {step}"})
+        store.append({"role": "user", "content": f"observation {step}"})
+    store.openai_messages()
+
+    store[3]["content"] = "edited in place"
+    store.insert(2, {"role": "user", "content": "inserted"})
+    del store[-1]
+    prompt = store.openai_messages()
+    assert prompt_text(prompt) == history_text(store)
+    assert prompt.chars == sum(len(message["content"]) for message in store)
+    assert prompt.assistant_turns == sum(message["role"] == "assistant" for message in store)
+
+def test_budgeted_prompt_follows_changes():
+    budget = ContextBudget(200, keep_recent=2)
+    store = MessageStore([{"role": "system", "content": "system"}, {"role": "user", "content": "task"}])
+    for step in range(20):
+        store.append({"role": "assistant", "content": f"call {step}"})
+        store.append({"role": "user", "content": "x" * 400})
+        store.openai_messages(budget)
+    store[-1]["content"] = "short"
+    prompt = store.openai_messages(budget)
+    expected = budget.fitted[:2] + budget.fitted[budget.dropped:]
+    assert prompt_text(prompt) == [(message["role"], message["content"]) for message in expected]
+    assert prompt_text(prompt)[-1] == ("user", "short")
@@ -0,0 +1,62 @@
+"""Model functions are called the way they need to be."""
+
+import asyncio
+import threading
+
+import pytest
+
+from agent import MCPSimpleAgent
+from response_cache import ResponseCache
+
+def make_agent(model) -> MCPSimpleAgent:
+    return MCPSimpleAgent(server_parameters=None, model=model)
+
+@pytest.fixture
+def no_threads(monkeypatch):
+    """Fail if anything is handed to a worker thread."""
+    async def to_thread(function, *args, **kwargs):
+        raise AssertionError(f"{function!r} was run in a worker thread")
+    monkeypatch.setattr(asyncio, "to_thread", to_thread)
+
+def test_async_model_is_awaited_on_event_loop(no_threads):
+    async def model(messages):
+        return "done"
+
+    assert asyncio.run(make_agent(model)._call_model([])) == "done"
+
+def test_streaming_model_is_consumed_on_event_loop(no_threads):
+    async def model(messages):
+        yield "do"
+        yield "ne"
+
+    assert asyncio.run(make_agent(model)._call_model([])) == "done"
+
+def test_async_callable_object_is_awaited_on_event_loop(no_threads):
+    class Model:
+        async def __call__(self, messages):
+            return "done"
+
+    assert asyncio.run(make_agent(Model())._call_model([])) == "done"
+
+def test_sync_model_runs_in_worker_thread():
+    threads = []
+
+    def model(messages):
+        threads.append(threading.current_thread())
+        return "done"
+
+    assert asyncio.run(make_agent(model)._call_model([])) == "done"
+    assert threads and threads[0] is not threading.main_thread()
+
+def test_cached_async_model_is_awaited_on_event_loop(no_threads, tmp_path):
+    calls = []
+
+    async def model(messages):
+        calls.append(messages)
+        return "done"
+
+    cached = ResponseCache(str(tmp_path)).wrap(model, model="test")
+    agent = make_agent(cached)
+    assert asyncio.run(agent._call_model([{"role": "user", "content": "hi"}])) == "done"
+    assert asyncio.run(agent._call_model([{"role": "user", "content": "hi"}])) == "done"
+    assert len(calls) == 1
@@ -0,0 +1,78 @@
+"""Server settings reach the MCP server started from the CLI's parameters."""
+
+import asyncio
+import http.server
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from mcp import ClientSession
+from mcp.client.stdio import get_default_environment, stdio_client
+
+import agent_cli
+
+async def call_tool(name: str, arguments: dict) -> str:
+    async with stdio_client(agent_cli.get_server_parameters()) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            result = await session.call_tool(name, arguments)
+            return result.content[0].text
+
+def test_command_timeout_reaches_server(monkeypatch):
+    monkeypatch.setenv("AGENT_COMMAND_TIMEOUT", "1")
+    start = time.monotonic()
+    output = asyncio.run(call_tool("run_terminal_command", {"command": "sleep 3"}))
+    assert "timed out after 1s" in output
+    assert time.monotonic() - start < 3
+
+def test_persistent_shell_flag_is_merged(monkeypatch):
+    monkeypatch.setenv("AGENT_OUTPUT_LIMIT", "1024")
+    env = agent_cli.get_server_parameters(persistent_shell=True).env
+    assert env["AGENT_OUTPUT_LIMIT"] == "1024"
+    assert env["AGENT_PERSISTENT_SHELL"] == "1"
+
+def server_settings(names: list) -> dict:
+    """Settings as server.py reads them when started with the CLI's parameters."""
+    parameters = agent_cli.get_server_parameters()
+    env = {**get_default_environment(), **(parameters.env or {})}
+    script = f"import json, server; print(json.dumps({{name: getattr(server, name) for name in {names!r}}}))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=os.path.dirname(parameters.args[0]),
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+def test_aider_settings_reach_server(monkeypatch):
+    monkeypatch.setenv("AGENT_AIDER_TIMEOUT", "30")
+    monkeypatch.setenv("AGENT_AIDER_IDLE_TIMEOUT", "60")
+    monkeypatch.setenv("AGENT_AIDER_SESSIONS", "2")
+    settings = server_settings(["AIDER_TIMEOUT", "AIDER_IDLE_TIMEOUT", "AIDER_MAX_SESSIONS"])
+    assert settings == {"AIDER_TIMEOUT": 30.0, "AIDER_IDLE_TIMEOUT": 60.0, "AIDER_MAX_SESSIONS": 2}
+
+class WeatherHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = f"{self.path.split('?')[0].strip('/')}: sunny".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_weather_settings_reach_server(monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), WeatherHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        monkeypatch.setenv("AGENT_WEATHER_URL", f"http://127.0.0.1:{server.server_port}")
+        assert asyncio.run(call_tool("fetch_weather", {"city": "Paris"})) == "Paris: sunny"
+    finally:
+        server.shutdown()
+    monkeypatch.setenv("AGENT_WEATHER_CACHE_TTL", "5")
+    monkeypatch.setenv("AGENT_WEATHER_CONCURRENCY", "3")
+    monkeypatch.setenv("AGENT_HTTP_TIMEOUT", "2")
+    settings = server_settings(["WEATHER_CACHE_TTL", "WEATHER_CONCURRENCY", "HTTP_TIMEOUT"])
+    assert settings == {"WEATHER_CACHE_TTL": 5.0, "WEATHER_CONCURRENCY": 3, "HTTP_TIMEOUT": 2.0}
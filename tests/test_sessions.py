@@ -0,0 +1,26 @@
+"""Warm sessions notice when their server exits."""
+
+import asyncio
+
+import pytest
+from mcp import McpError
+
+import agent_cli
+from sessions import WarmSession, connection_closed
+
+def test_call_in_flight_fails_when_server_exits():
+    async def run():
+        warm = await WarmSession(agent_cli.get_server_parameters()).start()
+        try:
+            # The command's shell is a child of the server, so $PPID is the server
+            with pytest.raises(McpError) as raised:
+                await asyncio.wait_for(
+                    warm.session.call_tool("run_terminal_command", {"command": "kill -9 $PPID; sleep 1"}), 10
+                )
+            assert connection_closed(raised.value)
+            await asyncio.sleep(0.1)
+            assert not warm.alive
+        finally:
+            await warm.stop()
+
+    asyncio.run(run())
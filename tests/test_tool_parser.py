@@ -0,0 +1,18 @@
+"""Repairs of raw control characters in strings are reported by name."""
+
+import json
+
+import pytest
+
+from tool_parser import repair_json
+
+@pytest.mark.parametrize("char, repair", [
+    ("\n", "newline in string"),
+    ("\t", "tab in string"),
+    ("\r", "carriage return in string"),
+    ("\x01", "control character in string"),
+])
+def test_control_character_repair_names_character(char, repair):
+    text, _, repairs = repair_json('{"command": "a' + char + 'b"}')
+    assert json.loads(text) == {"command": "a" + char + "b"}
+    assert repairs == [repair]
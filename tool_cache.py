@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tool result cache - reuse observations for repeated, cacheable tool calls.
+
+Tools opt in by declaring a cache policy in their MCP metadata, e.g.
+
+    @mcp.tool(meta={"cache": {"ttl": 600}})
+
+Supported policy fields:
+    ttl: Seconds an entry stays valid
+    watch_cwd: Invalidate entries when files in the working directory change
+    argument_patterns: Map of argument name to a regex the value must fully
+        match for the call to be cacheable (e.g. read-only shell commands)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("mcp_simple_agent")
+
+# Large directories that are not walked; only their own mtime is watched
+IGNORED_DIRECTORIES = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
+@dataclass
+class CachePolicy:
+    """How results of one tool may be cached."""
+    ttl: float
+    watch_cwd: bool = False
+    argument_patterns: Dict[str, "re.Pattern"] = field(default_factory=dict)
+
+    @classmethod
+    def from_tool(cls, tool) -> Optional["CachePolicy"]:
+        """Read the policy a tool declares in its metadata, if any."""
+        declared = (getattr(tool, "meta", None) or {}).get("cache")
+        if not declared:
+            return None
+        return cls(
+            ttl=float(declared.get("ttl", 60)),
+            watch_cwd=bool(declared.get("watch_cwd", False)),
+            argument_patterns={
+                name: re.compile(pattern)
+                for name, pattern in declared.get("argument_patterns", {}).items()
+            },
+        )
+
+    def allows(self, arguments: Dict[str, Any]) -> bool:
+        """Whether a call with these arguments may be served from the cache."""
+        for name, pattern in self.argument_patterns.items():
+            value = arguments.get(name)
+            if not isinstance(value, str) or not pattern.fullmatch(value):
+                return False
+        return True
+
+def directory_fingerprint(path: str, max_entries: int = 5000) -> Optional[str]:
+    """Hash the names and modification times of the files under a directory.
+
+    Returns None if the tree has more than `max_entries` entries, in which case
+    it is too expensive to watch and calls should not be cached.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    for root, dirs, files in os.walk(path):
+        entries = sorted(files + dirs)
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRECTORIES)
+        for name in entries:
+            count += 1
+            if count > max_entries:
+                return None
+            try:
+                mtime = os.stat(os.path.join(root, name)).st_mtime_ns
+            except OSError:
+                continue
+            digest.update(f"{os.path.join(root, name)}\0{mtime}\0".encode())
+    return digest.hexdigest()
+
+class ToolResultCache:
+    """An LRU cache of tool observations with per-tool TTLs.
+
+    Keys are the tool name plus canonicalized arguments, and for tools that
+    watch the working directory, a fingerprint of its files. Entries can be
+    persisted to a JSON file so they survive across runs.
+    """
+
+    def __init__(self, max_entries: int = 512, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    async def key(self, tool_name: str, arguments: Dict[str, Any], policy: CachePolicy) -> Optional[str]:
+        """Build the cache key for a call, or None if it cannot be cached.
+
+        Fingerprinting the working directory walks it, so that runs in a
+        worker thread rather than blocking the event loop.
+        """
+        if not policy.allows(arguments):
+            return None
+        canonical = json.dumps([tool_name, arguments], sort_keys=True, separators=(",", ":"))
+        if policy.watch_cwd:
+            cwd = os.getcwd()
+            fingerprint = await asyncio.to_thread(directory_fingerprint, cwd)
+            if fingerprint is None:
+                return None
+            canonical += f"\0{cwd}\0{fingerprint}"
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached observation, counting the hit or miss."""
+        entry = self.entries.get(key)
+        if entry is None or entry["expires"] < time.time():
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry["value"]
+
+    def put(self, key: str, value: str, policy: CachePolicy):
+        """Store an observation, evicting the least recently used entries."""
+        self.entries[key] = {"value": value, "expires": time.time() + policy.ttl}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.entries),
+        }
+
+    def load(self):
+        """Load unexpired entries from the cache file, if it exists."""
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, entry in entries.items():
+            if entry.get("expires", 0) >= now:
+                self.entries[key] = entry
+
+    def save(self):
+        """Write unexpired entries to the cache file atomically."""
+        if not self.path:
+            return
+        now = time.time()
+        entries = {key: entry for key, entry in self.entries.items() if entry["expires"] >= now}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save tool cache: {e}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tool manifest - cache a server's tool list and render it into a stable prompt.
+
+The tools a server offers only change when its script does, so the
+`list_tools()` result is cached on disk, keyed by the server command and
+the script's path, and checked against the script's modification time and
+size (falling back to a content hash when those changed). A cache hit skips
+the list_tools round trip.
+
+The tool section of the system prompt is rendered deterministically: tools
+sorted by name and their JSON input schemas serialized canonically. It is
+placed before the caller's prompt, so the prompt prefix is byte-identical
+across runs, steps and working directories, and providers' prompt prefix
+caching can apply.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("mcp_simple_agent")
+
+FINAL_ANSWER_HELP = (
+    "- final_answer: Provide your final answer to the task\n"
+    "  Arguments (JSON schema): "
+    "{\"properties\":{\"answer\":{\"type\":\"string\"}},\"required\":[\"answer\"],\"type\":\"object\"}\n"
+)
+
+def server_script(server_parameters) -> Optional[str]:
+    """The script file a server is launched from, if any."""
+    for arg in server_parameters.args:
+        if os.path.isfile(arg):
+            return os.path.abspath(arg)
+    return None
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class ManifestCache:
+    """On-disk cache of servers' tool lists.
+
+    Args:
+        path: Optional JSON file to persist the cache to
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(server_parameters) -> Optional[str]:
+        """Cache key for a server, or None if it has no script file to watch.
+
+        The environment and working directory are part of the key, as servers
+        may offer different tools, or tool metadata, depending on them.
+        """
+        script = server_script(server_parameters)
+        if script is None:
+            return None
+        return json.dumps([
+            server_parameters.command, list(server_parameters.args), script,
+            sorted((server_parameters.env or {}).items()),
+            str(server_parameters.cwd) if server_parameters.cwd else None,
+        ])
+
+    def get(self, server_parameters):
+        """Return the cached ListToolsResult for a server, if its script is unchanged."""
+        key = self.key(server_parameters)
+        entry = self.entries.get(key) if key else None
+        if entry is None:
+            self.misses += 1
+            return None
+        script = server_script(server_parameters)
+        try:
+            stat = os.stat(script)
+            if (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["size"]):
+                # Touched but possibly unchanged: compare contents
+                if file_digest(script) != entry["sha256"]:
+                    self.misses += 1
+                    return None
+                entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                self.save()
+        except OSError:
+            self.misses += 1
+            return None
+
+        from mcp.types import ListToolsResult
+        self.hits += 1
+        return ListToolsResult.model_validate(entry["tools"])
+
+    def put(self, server_parameters, tools):
+        """Cache a server's ListToolsResult."""
+        key = self.key(server_parameters)
+        if key is None:
+            return
+        script = server_script(server_parameters)
+        try:
+            stat = os.stat(script)
+            self.entries[key] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": file_digest(script),
+                "tools": tools.model_dump(mode="json", by_alias=True, exclude_none=True),
+            }
+        except OSError as e:
+            logger.warning(f"Not caching tool manifest: {e}")
+            return
+        self.save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def load(self):
+        """Load the cache file, if it exists."""
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool manifest cache {self.path}: {e}")
+
+    def save(self):
+        """Write the cache file atomically."""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save tool manifest cache: {e}")
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def _example_arguments(schema: Dict[str, Any]) -> Dict[str, str]:
+    properties = schema.get("properties") or {}
+    names = schema.get("required") or sorted(properties)
+    return {name: f"<{properties.get(name, {}).get('type', 'value')}>" for name in names}
+
+@lru_cache(maxsize=32)
+def _render_tools(manifest: str, extra_help: str) -> str:
+    tools = json.loads(manifest)
+    lines = [
+        "You must respond with a JSON object in the following format:",
+        "{\"name\": \"tool_name\", \"arguments\": {\"arg1\": \"value1\"}}",
+        "",
+        "To make several independent tool calls at once, respond with a \"calls\" list instead:",
+        "{\"calls\": [{\"name\": \"tool_name\", \"arguments\": {\"arg1\": \"value1\"}}, "
+        "{\"name\": \"tool_name\", \"arguments\": {\"arg1\": \"value2\"}}]}",
+        "",
+        "Available tools:",
+    ]
+    for name, description, schema in tools:
+        lines.append(f"- {name}: " + "\n  ".join(description.splitlines()))
+        lines.append(f"  Arguments (JSON schema): {_canonical(schema)}")
+    text = "\n".join(lines) + "\n"
+    if not any(name == "final_answer" for name, _, _ in tools):
+        text += FINAL_ANSWER_HELP
+    text += extra_help
+
+    text += "\nExamples:\n"
+    if tools:
+        name, _, schema = tools[0]
+        text += json.dumps({"name": name, "arguments": _example_arguments(schema)}) + "\n"
+    text += "{\"name\": \"final_answer\", \"arguments\": {\"answer\": \"Your comprehensive answer\"}}\n\n"
+    text += "IMPORTANT: Your response must be a valid JSON object with the format shown above.\n"
+    return text
+
+def render_system_prompt(base_prompt: str, tools: List[Any], extra_help: str = "") -> str:
+    """Render the system prompt: the tool section first, then the caller's prompt.
+
+    The tool section depends only on the tools (sorted by name, schemas
+    serialized canonically) and `extra_help`, and is rendered once per
+    distinct manifest.
+
+    Args:
+        base_prompt: The caller's system prompt
+        tools: MCP Tool objects
+        extra_help: Help lines for built-in tools, appended to the tool list
+    """
+    manifest = _canonical(sorted(
+        [tool.name, inspect.cleandoc(tool.description or f"Call the {tool.name} tool"), tool.inputSchema or {}]
+        for tool in tools
+    ))
+    return _render_tools(manifest, extra_help) + "\n" + base_prompt.strip() + "\n"
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Tool call parser - turn model output into tool calls, forgiving common mistakes.
+
+Every response the agent cannot parse costs a full extra model round trip
+(and one of a handful of steps) just to tell the model to try again. The
+parser therefore:
+
+- decodes the first JSON value with `raw_decode` semantics, so leading prose,
+  trailing prose and markdown code fences are ignored;
+- repairs common malformations: trailing commas, single-quoted strings,
+  unquoted keys, Python literals, raw newlines and other control characters
+  in strings, unclosed strings and brackets, concatenated call objects and
+  JSON-encoded argument strings;
+- validates arguments against each MCP tool's input schema before dispatch,
+  coercing numeric and boolean strings (and numbers given for strings)
+  where the schema asks for them;
+- scans streamed output incrementally (ToolCallScanner) so calls can be
+  dispatched as soon as they are complete.
+
+It counts parses that needed a repair, each of which would otherwise have
+cost a retry step.
+"""
+
+import importlib.util
+import json
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("mcp_simple_agent")
+
+# jsonschema is optional and imported on first validation; without it only
+# required arguments are checked
+JSONSCHEMA_AVAILABLE = importlib.util.find_spec("jsonschema") is not None
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+FENCE = re.compile(r"```[A-Za-z0-9_-]*[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+LITERALS = {"True": "true", "False": "false", "None": "null"}
+# Raw control characters JSON strings may not contain: their escape and name
+CONTROL_ESCAPES = {
+    "\n": ("\\n", "newline"),
+    "\t": ("\\t", "tab"),
+    "\r": ("\\r", "carriage return"),
+    "\b": ("\\b", "backspace"),
+    "\f": ("\\f", "form feed"),
+}
+# Candidate start positions tried before giving up
+MAX_CANDIDATES = 20
+
+class ToolCallScanner:
+    """Incrementally scan streamed model output for complete tool calls.
+
+    Chunks are fed in as they arrive. Each top-level JSON value is checked as
+    it closes: values that aren't tool calls (prose such as "[1, 2]") are
+    skipped, and further call objects right after a call are read too, as
+    concatenated calls. `feed` returns True once something other than
+    another call follows a call, so the caller can stop reading the stream
+    and dispatch without waiting for the rest of the response. If the stream
+    ends first, all of it is parsed.
+
+    Args:
+        parser: Parser deciding whether a value is a tool call
+    """
+
+    def __init__(self, parser: Optional["ToolCallParser"] = None):
+        self.parser = parser or ToolCallParser()
+        self.chunks = []
+        self.depth = 0
+        self.quote = None
+        self.escape = False
+        self.complete = False
+        self._start = 0
+        self._end = None
+        self._length = 0
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of text and report whether the calls are complete."""
+        if self.complete:
+            return True
+        self.chunks.append(chunk)
+        for i, char in enumerate(chunk):
+            if self.quote:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == self.quote:
+                    self.quote = None
+            elif char in "\"'":
+                # Quotes only delimit strings inside a value; prose has apostrophes
+                if self.depth:
+                    self.quote = char
+            elif char in "{[":
+                if self.depth == 0:
+                    if self._end is not None and char != "{":
+                        self.complete = True
+                        break
+                    self._start = self._length + i
+                self.depth += 1
+            elif char in "}]" and self.depth:
+                self.depth -= 1
+                if self.depth == 0:
+                    end = self._length + i + 1
+                    if self.parser.accepts("".join(self.chunks)[self._start:end]):
+                        self._end = end
+                    elif self._end is not None:
+                        self.complete = True
+                        break
+            elif self.depth == 0 and self._end is not None and not (char.isspace() or char == ","):
+                self.complete = True
+                break
+        self._length += len(chunk)
+        return self.complete
+
+    @property
+    def text(self) -> str:
+        """The text received so far, cut after the last call if complete."""
+        text = "".join(self.chunks)
+        return text[:self._end] if self.complete else text
+
+def repair_json(text: str, start: int = 0) -> Tuple[str, int, List[str]]:
+    """Rewrite one JSON-like value starting at `start` into valid JSON.
+
+    Returns:
+        tuple: The repaired text of the value, the index just after the value
+               in the input, and the names of the repairs made
+    """
+    out: List[str] = []
+    repairs: List[str] = []
+    stack: List[str] = []
+    quote = None
+    i, n = start, len(text)
+
+    def note(repair: str):
+        if repair not in repairs:
+            repairs.append(repair)
+
+    while i < n:
+        char = text[i]
+        if quote:
+            if char == "\\" and i + 1 < n:
+                if quote == "'" and text[i + 1] == "'":
+                    out.append("'")
+                else:
+                    out.append(text[i:i + 2])
+                i += 2
+                continue
+            if char == quote:
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')
+            elif char < " ":
+                escape, name = CONTROL_ESCAPES.get(char, (f"\\u{ord(char):04x}", "control character"))
+                out.append(escape)
+                note(f"{name} in string")
+            else:
+                out.append(char)
+            i += 1
+            continue
+
+        if char in "\"'":
+            if char == "'":
+                note("single quotes")
+            quote = char
+            out.append('"')
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            # Drop a trailing comma before the closing bracket
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+                note("trailing comma")
+            if stack:
+                expected = stack.pop()
+                if char != expected:
+                    note("mismatched bracket")
+                out.append(expected)
+            if not stack:
+                i += 1
+                break
+        elif char.isalpha() or char == "_":
+            match = re.match(r"[A-Za-z_][A-Za-z0-9_]*", text[i:])
+            word = match.group(0)
+            rest = text[i + len(word):].lstrip()
+            if rest.startswith(":") and stack and stack[-1] == "}":
+                out.append(json.dumps(word))
+                note("unquoted key")
+            elif word in LITERALS:
+                out.append(LITERALS[word])
+                note("python literal")
+            else:
+                out.append(word)
+            i += len(word)
+            continue
+        else:
+            out.append(char)
+        i += 1
+
+    if quote:
+        out.append('"')
+        note("unterminated string")
+    if stack:
+        out.extend(reversed(stack))
+        note("unclosed brackets")
+    return "".join(out), i, repairs
+
+def _coerce_value(value: Any, expected: Optional[str]) -> Any:
+    """The value converted to the expected JSON type, or None if no conversion applies."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return str(value) if expected == "string" else None
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if expected == "integer" and re.fullmatch(r"-?\d+", text):
+        return int(text)
+    if expected == "number" and re.fullmatch(r"-?\d+(\.\d+)?([eE][-+]?\d+)?", text):
+        return float(text)
+    if expected == "boolean" and text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    return None
+
+class ToolCallParser:
+    """Parse tool calls from model output and validate their arguments.
+
+    Args:
+        schemas: Optional map of tool name to its JSON input schema
+    """
+
+    def __init__(self, schemas: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.schemas: Dict[str, Dict[str, Any]] = {}
+        self._validators: Dict[str, Any] = {}
+        self.last_repairs: List[str] = []
+        self.parsed = 0
+        self.repaired = 0
+        self.failed = 0
+        self.invalid = 0
+        self.coerced = 0
+        self.repair_counts: Counter = Counter()
+        if schemas:
+            self.set_schemas(schemas)
+
+    def set_schemas(self, schemas: Dict[str, Dict[str, Any]]):
+        """Set the input schemas used to validate arguments."""
+        self.schemas = dict(schemas)
+        self._validators.clear()
+
+    def parse(self, text: str) -> List[ToolCall]:
+        """Parse one or more tool calls from model output.
+
+        Accepts a single call object, a JSON array of call objects, or an
+        object with a "calls" list of call objects.
+
+        Raises:
+            ValueError: If no tool call can be recovered from the text
+        """
+        try:
+            calls, repairs = self._parse(text)
+        except ValueError as e:
+            self.failed += 1
+            raise ValueError(f"Failed to parse tool call: {e}")
+        self.parsed += 1
+        self.last_repairs = repairs
+        if repairs:
+            self.repaired += 1
+            self.repair_counts.update(repairs)
+            logger.info(f"Repaired tool call: {', '.join(repairs)}")
+        return calls
+
+    def _parse(self, text: str) -> Tuple[List[ToolCall], List[str]]:
+        repairs: List[str] = []
+        body = text
+        fenced = FENCE.search(text)
+        if fenced and re.search(r"[\[{]", fenced.group(1)):
+            body = fenced.group(1)
+            repairs.append("code fence")
+
+        starts = [m.start() for m in re.finditer(r"[\[{]", body)][:MAX_CANDIDATES]
+        if not starts:
+            raise ValueError("No JSON object found in text")
+
+        decoder = json.JSONDecoder()
+        error: Exception = ValueError("No tool call found in text")
+        skip_until = 0
+        for start in starts:
+            # Don't look for calls nested in a value that was not a call
+            if start < skip_until:
+                continue
+            # Valid JSON first, then a repaired version of the same value
+            attempts = []
+            try:
+                value, end = decoder.raw_decode(body, start)
+                attempts.append((value, end, []))
+            except json.JSONDecodeError as e:
+                error = e
+                fixed, end, fixes = repair_json(body, start)
+                try:
+                    attempts.append((json.loads(fixed), end, fixes))
+                except json.JSONDecodeError as e:
+                    error = e
+            for value, end, fixes in attempts:
+                try:
+                    calls, shape_fixes = self._calls(value)
+                except ValueError as e:
+                    error = e
+                    skip_until = max(skip_until, end)
+                    continue
+                more, end = self._concatenated(body, end, decoder)
+                if more:
+                    calls += more
+                    fixes = fixes + ["concatenated calls"]
+                if body[end:].strip():
+                    fixes = fixes + ["trailing text"]
+                if start != starts[0]:
+                    fixes = fixes + ["skipped non-call JSON"]
+                return calls, repairs + fixes + shape_fixes
+        raise ValueError(str(error))
+
+    def accepts(self, text: str) -> bool:
+        """Whether a JSON value, repaired if needed, holds tool calls."""
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                value = json.loads(repair_json(text)[0])
+            except json.JSONDecodeError:
+                return False
+        try:
+            self._calls(value)
+        except ValueError:
+            return False
+        return True
+
+    def _calls(self, value: Any) -> Tuple[List[ToolCall], List[str]]:
+        """Extract (name, arguments) pairs from a decoded value."""
+        fixes = []
+        if isinstance(value, dict) and "calls" in value:
+            value = value["calls"]
+        calls = value if isinstance(value, list) else [value]
+        if not calls:
+            raise ValueError("Empty list of tool calls")
+        tool_calls = []
+        for call in calls:
+            if not isinstance(call, dict) or not isinstance(call.get("name"), str):
+                raise ValueError("Tool call missing 'name' field")
+            arguments = call.get("arguments", {})
+            if isinstance(arguments, str):
+                # Some models send arguments JSON-encoded, as in the OpenAI API
+                try:
+                    arguments = json.loads(arguments) if arguments.strip() else {}
+                    fixes.append("stringified arguments")
+                except json.JSONDecodeError:
+                    pass
+            tool_calls.append((call["name"], arguments if arguments is not None else {}))
+        return tool_calls, fixes
+
+    def _concatenated(self, body: str, end: int, decoder: json.JSONDecoder) -> Tuple[List[ToolCall], int]:
+        """Further call objects following the first, separated by whitespace or commas."""
+        calls = []
+        while True:
+            match = re.compile(r"[\s,]*").match(body, end)
+            position = match.end()
+            if position >= len(body) or body[position] != "{":
+                return calls, end
+            try:
+                value, next_end = decoder.raw_decode(body, position)
+                more, _ = self._calls(value)
+            except ValueError:
+                return calls, end
+            calls += more
+            end = next_end
+
+    def validate(self, name: str, arguments: Any) -> Dict[str, Any]:
+        """Check a call's arguments against the tool's input schema.
+
+        Numeric and boolean strings are coerced where the schema asks for
+        numbers or booleans, and numbers where it asks for strings.
+
+        Returns:
+            dict: The arguments, coerced if needed
+
+        Raises:
+            ValueError: If the arguments do not match the schema
+        """
+        if not isinstance(arguments, dict):
+            self.invalid += 1
+            raise ValueError(f"Arguments for {name} must be a JSON object")
+        schema = self.schemas.get(name)
+        if not schema:
+            return arguments
+
+        arguments = self._coerce(schema, arguments)
+        if JSONSCHEMA_AVAILABLE:
+            validator = self._validators.get(name)
+            if validator is None:
+                import jsonschema
+                validator = jsonschema.validators.validator_for(schema)(schema)
+                self._validators[name] = validator
+            error = next(iter(validator.iter_errors(arguments)), None)
+            if error is not None:
+                self.invalid += 1
+                where = ".".join(str(part) for part in error.absolute_path)
+                raise ValueError(f"Invalid arguments for {name}{f' ({where})' if where else ''}: {error.message}")
+        else:
+            missing = [key for key in schema.get("required", []) if key not in arguments]
+            if missing:
+                self.invalid += 1
+                raise ValueError(f"Invalid arguments for {name}: missing {', '.join(missing)}")
+        return arguments
+
+    def _coerce(self, schema: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        properties = schema.get("properties") or {}
+        coerced = None
+        for key, value in arguments.items():
+            if key not in properties:
+                continue
+            new_value = _coerce_value(value, properties[key].get("type"))
+            if new_value is not None:
+                coerced = coerced or dict(arguments)
+                coerced[key] = new_value
+        if coerced is None:
+            return arguments
+        self.coerced += 1
+        self.repair_counts["coerced argument"] += 1
+        return coerced
+
+    def stats(self) -> Dict[str, Any]:
+        """Parse counters. Each repaired parse or coercion saved a retry step."""
+        return {
+            "parsed": self.parsed,
+            "repaired": self.repaired,
+            "failed": self.failed,
+            "invalid": self.invalid,
+            "steps_saved": self.repaired + self.coerced,
+            "repairs": dict(self.repair_counts),
+        }